@@ -6,7 +6,20 @@ from glm import ivec2, vec2
 
 from game.base.inputs import Inputs
 from game.base.signal import Signal
-from game.constants import SPRITES_DIR, DEBUG
+from game.constants import (
+    SPRITES_DIR,
+    DEBUG,
+    FIXED_TIMESTEP,
+    MAX_FIXED_STEPS,
+    MAX_FPS,
+    SPRITE_CACHE_BUDGET,
+    RESOURCE_BUDGETS,
+    FOG_LEVELS,
+    RENDER_SCALE,
+)
+from game.base.fonts import FontService
+from game.base.resources import ResourceCache
+from game.base.sprites import SpriteCache
 from game.base.stats import Stats
 
 from game.states.game import Game
@@ -39,14 +52,32 @@ class App:
 
         self.size = ivec2(1920, 1080) / 2
         """Display size"""
-        self.cache = {}
+        self.cache = ResourceCache(RESOURCE_BUDGETS)
         """Resources with filenames as keys"""
-        self.screen = pygame.display.set_mode(self.size)
+        self.sprites = SpriteCache(SPRITE_CACHE_BUDGET, FOG_LEVELS)
+        """Scaled sprites, see Entity.render()"""
+        self.fonts = FontService()
+        """Fonts and glyph atlases shared by the terminals and messages"""
+        self.display = pygame.display.set_mode(self.size)
+        self.render_scale = RENDER_SCALE
+        self.render_size = ivec2(vec2(self.size) * self.render_scale)
+        """Size of the world render (screen), upscaled to the display"""
+        if self.render_size == self.size:
+            self.render_scale = 1
+            self.screen = self.display
+        else:
+            self.screen = pygame.Surface(self.render_size).convert()
+        self.hud = []
+        """Surfaces drawn over the upscaled world this frame (see Terminal)"""
         self.on_event = Signal()
         self.quit = False
         self.clock = pygame.time.Clock()
         self.inputs = Inputs()
         self.time = 0
+        self.fixed_timestep = FIXED_TIMESTEP
+        self.max_fps = MAX_FPS
+        self.alpha = None
+        """How far we are between the last two fixed steps (None if not fixed)"""
         self.dirty = True
         self.data = {}  # data persisting between modes
         # self.keys = [False] * self.MAX_KEYS
@@ -56,18 +87,17 @@ class App:
         self.next_state = initial_state
         self.process_state_change()
 
-    def load(self, filename, resource_func):
+    def load(self, filename, resource_func, scoped=False, pinned=False):
         """
         Attempt to load a resource from the cache, otherwise, loads it
         :param resource_func: a function that loads the resource if its
             not already available in the cache
+        :param scoped: only needed by the current level (see ResourceCache)
+        :param pinned: never evicted from the cache
         """
-        if filename not in self.cache:
-            r = self.cache[filename] = resource_func()
-            return r
-        return self.cache[filename]
+        return self.cache.load(filename, resource_func, None, scoped, pinned)
 
-    def load_img(self, filename, scale=1, flipped=False):
+    def load_img(self, filename, scale=1, flipped=False, scoped=False, pinned=False):
         """
         Load the image at the given path in a pygame surface.
         The file name is the name of the file without the full path.
@@ -85,7 +115,7 @@ class App:
                     img = pygame.transform.flip(img, True, False)
             return img
 
-        return self.load((filename, scale, flipped), load_fn)
+        return self.load((filename, scale, flipped), load_fn, scoped, pinned)
 
     # def pend(self):
 
@@ -99,24 +129,22 @@ class App:
         Runs update(dt) and render() of the current game state (default: Game)
         """
 
-        last_t = time.time_ns()
+        clock = time.perf_counter  # monotonic
+        last_t = clock()
+        next_frame = last_t
         accum = 0
+        lag = 0  # simulation time not run yet, for fixed steps
         self.fps = 0
         frames = 0
-        dt = 0
 
         self.inputs.event([])
 
         while (not self.quit) and self.state:
 
-            cur_t = time.time_ns()
-            dt += (cur_t - last_t) / (1000 * 1000 * 1000)
-
-            # if dt < 0.001:
-            #     time.sleep(1 / 300)
-            #     continue  # accumulate dt for skipped frames
-
+            cur_t = clock()
+            dt = cur_t - last_t
             last_t = cur_t
+
             accum += dt
             frames += 1
             if accum > 1:
@@ -138,14 +166,37 @@ class App:
             if DEBUG:
                 print("FRAME, dt =", dt, "FPS,", self.fps)
 
-            self.inputs.update(dt)
-            if self.update(dt) is False:
-                break
+            step = self.fixed_timestep
+            if step:
+                lag += dt
+                steps = 0
+                while lag >= step:
+                    if steps == MAX_FIXED_STEPS:
+                        # too far behind (long load, GC pause...), skip ahead
+                        lag %= step
+                        break
+                    self.inputs.update(step)
+                    if self.update(step) is False:
+                        break
+                    lag -= step
+                    steps += 1
+                self.alpha = lag / step
+            else:
+                self.alpha = None
+                self.inputs.update(dt)
+                if self.update(dt) is False:
+                    break
 
             if self.render() is False:
                 break
 
-            dt = 0  # reset to accumulate
+            if self.max_fps:
+                next_frame += 1 / self.max_fps
+                wait = next_frame - clock()
+                if wait > 0:
+                    time.sleep(wait)
+                else:
+                    next_frame = clock()  # running late, don't try to catch up
 
     def add_event_listener(self, obj):
         slot = self.on_event.connect(obj.event)
@@ -182,8 +233,27 @@ class App:
 
         self.state.render()
 
+        if self.screen is not self.display:
+            # upscale the world, then the HUD at full resolution
+            pygame.transform.scale(self.screen, self.size, self.display)
+            for surf in self.hud:
+                self.display.blit(surf, (0, 0))
+        self.hud.clear()
+
         pygame.display.update()
 
+    def blit_scaled(self, surf, pos):
+        """
+        Blit a surface sized and placed in display pixels (the ship,
+        the crosshair...) on the screen, which may be smaller (render_scale)
+        """
+        s = self.render_scale
+        if s != 1:
+            w, h = surf.get_size()
+            surf = pygame.transform.scale(surf, (max(1, int(w * s)), max(1, int(h * s))))
+            pos = (pos[0] * s, pos[1] * s)
+        self.screen.blit(surf, pos)
+
     @property
     def state(self):
         return self._state
@@ -213,6 +283,8 @@ class App:
             self.next_state = "game"
 
         if self.next_state:
+            # release what only the previous level needed
+            self.cache.enter(lvl or self.next_state.lower())
             self._state = self.STATES[self.next_state.lower()](self)
 
         self.next_state = None
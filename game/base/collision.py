@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+"""
+Broadphase collision helpers used by Scene.update_collisions.
+
+Each broadphase takes a list of entities and yields the pairs
+whose collision boxes overlap.  Dispatching to collision() is left
+to the scene.
+
+The "batch" broadphase packs every collider into a numpy table
+(ColliderTable) and tests all the pairs at once.
+
+Pairs whose layers don't interact (see LAYER_* in constants) are
+pruned before any geometry test.  Pass a `stats` dict to count them.
+
+Contacts keeps the touching pairs from one frame to the next so the
+scene can tell when a contact starts (enter), goes on (stay) or ends
+(leave).
+
+Swept entities (Entity.swept, e.g. bullets) are tested along the
+segment they moved through since the last frame, so they can't tunnel
+through anything however long the frame was.
+"""
+
+import glm
+import numpy as np
+
+from game.constants import EPSILON
+from game.util import segment_aabb
+
+
+def invalid_size(size):
+    """Checks component for 0 or NaNs"""
+    return any(c != c or abs(c) < EPSILON for c in size)
+
+
+def wants(a, b):
+    """True if a has a collision() callback interested in b's layer"""
+    return a.has_collision and a.collision_mask & b.collision_layer
+
+
+def interacts(a, b):
+    """True if either entity wants to be told about the other"""
+    return wants(a, b) or wants(b, a)
+
+
+def overlaps(a, b):
+    """AABB test between the collision boxes of a and b"""
+    a_min = a.position - a.collision_size / 2
+    a_max = a.position + a.collision_size / 2
+    b_min = b.position - b.collision_size / 2
+    b_max = b.position + b.collision_size / 2
+    return not (
+        b_min.x > a_max.x
+        or b_max.x < a_min.x
+        or b_min.y > a_max.y
+        or b_max.y < a_min.y
+        or b_min.z > a_max.z
+        or b_max.z < a_min.z
+    )
+
+
+def swept_overlaps(a, b):
+    """
+    Continuous test: does the box of a, moving along a.sweep(), ever touch
+    the box of b moving along b.sweep()?
+    Done in b's frame of reference, against the box of both sizes summed.
+    """
+    a0, a1 = a.sweep()
+    b0, b1 = b.sweep()
+    half = (a.collision_size + b.collision_size) / 2
+    return segment_aabb(a0 - b0, a1 - b1, -half, half) is not None
+
+
+def collides(a, b):
+    """Narrowphase: swept test if one of them is swept, AABB otherwise"""
+    if a.swept or b.swept:
+        return swept_overlaps(a, b)
+    return overlaps(a, b)
+
+
+def bounds(e):
+    """Box (min, max) around everything the entity touched this frame"""
+    p0, p1 = e.sweep()
+    half = e.collision_size / 2
+    return glm.min(p0, p1) - half, glm.max(p0, p1) + half
+
+
+def colliders(entities):
+    """Filter the entities that can take part in a collision"""
+    return [
+        e for e in entities if e and e.solid and not invalid_size(e.collision_size)
+    ]
+
+
+class Contacts:
+    """
+    The set of touching pairs, kept from frame to frame.
+
+    Call begin(), then touch() for every overlapping pair found this frame,
+    then end() which returns the pairs that stopped touching.
+    """
+
+    def __init__(self):
+        self.touching = {}  # (id, id) -> (a, b), as of the last end()
+        self.current = {}
+
+    def __len__(self):
+        return len(self.touching)
+
+    def __contains__(self, pair):
+        return self.key(*pair) in self.touching
+
+    @staticmethod
+    def key(a, b):
+        a, b = id(a), id(b)
+        return (a, b) if a < b else (b, a)
+
+    def begin(self):
+        self.current = {}
+
+    def touch(self, a, b):
+        """
+        Record that a and b touch this frame.
+        :return: (new, entered)
+            new is False if the pair was already seen this frame
+            entered is True if they weren't touching last frame
+        """
+        key = self.key(a, b)
+        if key in self.current:
+            return False, False
+        self.current[key] = (a, b)
+        return True, key not in self.touching
+
+    def end(self):
+        """
+        :return: list of the (a, b) pairs that stopped touching
+        """
+        left = [
+            pair for key, pair in self.touching.items() if key not in self.current
+        ]
+        self.touching = self.current
+        self.current = {}
+        return left
+
+    def clear(self):
+        self.touching = {}
+        self.current = {}
+
+
+def new_stats():
+    return {"tested": 0, "pruned": 0, "hits": 0}
+
+
+def brute_force_pairs(entities, stats=None):
+    """
+    Test every solid entity against every other one.
+    Pairs come out in both orders, (a, b) and then later (b, a).
+    """
+
+    stats = stats if stats is not None else new_stats()
+    entities = colliders(entities)
+    for a in entities:
+        for b in entities:
+            if a is b:
+                continue
+            if not interacts(a, b):
+                stats["pruned"] += 1
+                continue
+            stats["tested"] += 1
+            if collides(a, b):
+                stats["hits"] += 1
+                yield a, b
+
+
+def sweep_pairs(entities, stats=None):
+    """
+    Sort-and-sweep along z.
+    Each overlapping pair comes out once.
+
+    The scene keeps its slots depth sorted, so sorting the intervals
+    by their near edge is almost free (timsort on nearly sorted data).
+    """
+
+    stats = stats if stats is not None else new_stats()
+    intervals = []
+    for e in colliders(entities):
+        if e.swept:
+            lo, hi = bounds(e)
+            intervals.append((lo.z, hi.z, e))
+        else:
+            half = e.collision_size.z / 2
+            z = e.position.z
+            intervals.append((z - half, z + half, e))
+    intervals.sort(key=lambda i: i[0])
+
+    active = []
+    for z_min, z_max, a in intervals:
+        # drop everything that ends before this interval starts
+        active = [i for i in active if i[1] >= z_min]
+        for _, _, b in active:
+            if not interacts(a, b):
+                stats["pruned"] += 1
+                continue
+            stats["tested"] += 1
+            if collides(a, b):
+                stats["hits"] += 1
+                yield b, a
+        active.append((z_min, z_max, a))
+
+
+class ColliderTable:
+    """
+    Packed float32 table of the solid entities.
+
+    One row per collider: position, half extents, layer and mask.
+    It is refreshed once per frame and tested in a single vectorized
+    pass instead of building glm vectors for every pair.
+    """
+
+    def __init__(self):
+        self.entities = []
+        self.capacity = 0
+        self.resize(64)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def resize(self, capacity):
+        self.capacity = capacity
+        self.position = np.zeros((capacity, 3), np.float32)
+        self.half = np.zeros((capacity, 3), np.float32)
+        self.layer = np.zeros(capacity, np.int32)
+        self.mask = np.zeros(capacity, np.int32)
+        self.has_collision = np.zeros(capacity, np.bool_)
+        self.swept = np.zeros(capacity, np.bool_)
+
+    def refresh(self, entities):
+        """Repack the table from the given entities"""
+
+        self.entities = [e for e in entities if e and e.solid]
+        n = len(self.entities)
+        if n > self.capacity:
+            self.resize(max(n, self.capacity * 2))
+        if not n:
+            return
+
+        ents = self.entities
+        self.position[:n] = [tuple(e.position) for e in ents]
+        self.half[:n] = [tuple(e.collision_size) for e in ents]
+        self.half[:n] *= 0.5
+        self.layer[:n] = [e.collision_layer for e in ents]
+        self.mask[:n] = [e.collision_mask for e in ents]
+        self.has_collision[:n] = [e.has_collision for e in ents]
+        self.swept[:n] = [e.swept for e in ents]
+
+        # drop invalid sizes like colliders() does (NaNs fail the test too)
+        valid = np.all(np.abs(self.half[:n]) >= EPSILON / 2, axis=1)
+        if not valid.all():
+            self.entities = [e for e, v in zip(ents, valid.tolist()) if v]
+            m = len(self.entities)
+            for column in (
+                self.position,
+                self.half,
+                self.layer,
+                self.mask,
+                self.has_collision,
+                self.swept,
+            ):
+                column[:m] = column[:n][valid]
+            ents = self.entities
+            n = m
+
+        # swept rows hold the box around the whole segment,
+        # pairs() then runs the exact test on them
+        for k in np.flatnonzero(self.swept[:n]).tolist():
+            lo, hi = bounds(ents[k])
+            self.position[k] = tuple((lo + hi) / 2)
+            self.half[k] = tuple((hi - lo) / 2)
+
+    def pairs(self, stats=None):
+        """
+        Returns the (i, j) index arrays (i < j) of the overlapping colliders
+        whose layers interact.
+        """
+
+        stats = stats if stats is not None else new_stats()
+        n = len(self.entities)
+        if n < 2:
+            return np.zeros(0, np.intp), np.zeros(0, np.intp)
+
+        layer = self.layer[:n]
+        wants = self.has_collision[:n, None] & (
+            (self.mask[:n, None] & layer[None, :]) != 0
+        )
+        candidates = np.triu(wants | wants.T, 1)
+        tested = np.count_nonzero(candidates)
+        stats["pruned"] += n * (n - 1) // 2 - tested
+        stats["tested"] += tested
+
+        lo = self.position[:n] - self.half[:n]
+        hi = self.position[:n] + self.half[:n]
+        for axis in (2, 0, 1):  # z first, it rejects the most
+            candidates &= lo[:, None, axis] <= hi[None, :, axis]
+            candidates &= hi[:, None, axis] >= lo[None, :, axis]
+
+        i, j = np.nonzero(candidates)
+
+        swept = self.swept[i] | self.swept[j]
+        if swept.any():
+            ents = self.entities
+            exact = [
+                swept_overlaps(ents[a], ents[b])
+                for a, b in zip(i[swept].tolist(), j[swept].tolist())
+            ]
+            keep = ~swept
+            keep[swept] = exact
+            i, j = i[keep], j[keep]
+
+        stats["hits"] += len(i)
+        return i, j
+
+    def __call__(self, entities, stats=None):
+        """Broadphase interface: refresh and yield the entity pairs"""
+
+        self.refresh(entities)
+        ents = self.entities
+        i, j = self.pairs(stats)
+        for a, b in zip(i.tolist(), j.tolist()):
+            yield ents[a], ents[b]
+
+
+def batch_pairs(entities, stats=None):
+    """Vectorized test of every pair, using a throwaway ColliderTable"""
+    return ColliderTable()(entities, stats)
+
+
+BROADPHASES = {
+    "brute": brute_force_pairs,
+    "sweep": sweep_pairs,
+    "batch": batch_pairs,
+}
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Incremental depth ordering of the scene slots.
+
+From one frame to the next almost every entity keeps its place in the
+z order, so instead of sorting the whole list again we keep the slots
+that are still in order and only move the few that aren't (new ones,
+fast bullets...) back in place with a binary search.
+"""
+
+from bisect import bisect_right
+
+# above this fraction of displaced slots, a full sort is cheaper
+MAX_DISPLACED = 0.25
+
+
+def depth_sort(slots):
+    """
+    Depth sort the slots (far to close, by entity z) and drop the dead slots
+    and removed entities.
+
+    :return: (sorted list of slots, number of slots that were moved)
+    """
+
+    live = []
+    zs = []
+    for slot in slots:
+        if slot.dead:
+            continue
+        e = slot.get()
+        if not e.removed:
+            live.append(slot)
+            zs.append(e.position.z)
+
+    keys = []
+    kept = []
+    displaced = []
+    last = -float("inf")
+    n = len(zs)
+    for i, z in enumerate(zs):
+        # out of order, or jumped further than the next one which fits
+        if z < last or (i + 1 < n and last <= zs[i + 1] < z):
+            displaced.append((z, live[i]))
+        else:
+            keys.append(z)
+            kept.append(live[i])
+            last = z
+
+    if not displaced:
+        return kept, 0
+
+    if len(displaced) > n * MAX_DISPLACED:
+        # too far off, e.g. the first frame or a camera jump
+        order = sorted(range(n), key=zs.__getitem__)
+        return [live[i] for i in order], len(displaced)
+
+    for z, slot in displaced:
+        i = bisect_right(keys, z)
+        keys.insert(i, z)
+        kept.insert(i, slot)
+
+    return kept, len(displaced)
@@ -1,9 +1,13 @@
 #!/usr/bin/env python
 
 from game.base.being import Being
+from game.constants import LAYER_ENEMY, LAYER_PLAYER, LAYER_PLAYER_BULLET
 
 
 class Enemy(Being):
+    collision_layer = LAYER_ENEMY
+    collision_mask = LAYER_PLAYER | LAYER_PLAYER_BULLET
+
     def __init__(self, app, scene, **kwargs):
         super().__init__(app, scene, **kwargs)
         self.friendly = False
@@ -2,7 +2,7 @@
 from typing import TYPE_CHECKING
 
 import pygame
-from glm import ivec2
+from glm import ivec2, vec2
 from pygame.surface import SurfaceType
 
 from game.base.script import Script
@@ -23,6 +23,22 @@ class Entity:
     An Entity represents something that will be draw on the screen.
     """
 
+    # see LAYER_* in constants
+    collision_layer = LAYER_DEFAULT
+    collision_mask = LAYER_ALL
+    # swept entities collide along the segment they moved through last frame
+    # instead of at their current position only (see sweep())
+    swept = False
+    # False for entities that never draw anything (skipped by Scene.render)
+    renderable = True
+    # batched entities only draw with Entity.render(), which queues the blit
+    # (see Scene.flush()).  Entities drawing straight to the screen aren't.
+    batched = True
+    # cullable batched entities are skipped when off screen, and also past
+    # the fog if they fade in it (see Scene.cull())
+    cullable = True
+    fog = True
+
     def __init__(self, app, scene, filename=None, **kwargs):
         # print(type(self))
         self.app: "App" = app
@@ -47,12 +63,18 @@ class Entity:
         self.script = None  # main script
 
         self._position = kwargs.pop("position", vec3(0))
+        self.last_position = vec3(self._position)  # before last update()
         self.velocity = kwargs.pop("velocity", vec3(0))
         self.acceleration = kwargs.pop("acceleration", vec3(0))
 
         # solid means its collision-checked against other things
-        # has_collision means the entity has a collision() callback
-        self.has_collision = hasattr(self, "collision")
+        # has_collision means the entity has a collision(), collision_enter()
+        # or collision_leave() callback
+        self.has_collision = (
+            hasattr(self, "collision")
+            or hasattr(self, "collision_enter")
+            or hasattr(self, "collision_leave")
+        )
         self.solid = self.has_collision
         # if self.has_collision:
         #     print(self, 'has collision')
@@ -67,6 +89,10 @@ class Entity:
             self.collision_size = self.size = vec3(0)
         self.render_size = vec3(0)
         """Should hold the size in pixel at which the entity was last rendered"""
+        self.sprite_size = (0, 0)  # of the surface last rendered
+        self.projection = None
+        """Screen rect (x, y, w, h) of the sprite, set by Scene.project()"""
+        self.culled = False  # not visible last frame
 
         if hasattr(self, "event"):
             self.slots += app.add_event_listener(self)
@@ -149,6 +175,15 @@ class Entity:
         assert value == value
         self._velocity = value
 
+    def sweep(self):
+        """
+        Segment covered by the entity since the last frame, used for
+        swept collisions.
+        """
+        if self.swept:
+            return self.last_position, self.position
+        return self.position, self.position
+
     def remove(self):
         if not self.removed:
             # for slot in self.slots:
@@ -216,9 +251,12 @@ class Entity:
         # if len(self.slots) > 10:
         #     print(len(self.slots))
 
-        if self.ai:
+        if self.ai and not (CULL_AI and self.culled):
             self.ai.update(self, dt)
 
+        if self.swept:
+            self.last_position = vec3(self._position)
+
         if self.acceleration != vec3(0):
             self.velocity += self.acceleration * dt
         if self.velocity != vec3(0):
@@ -267,41 +305,69 @@ class Entity:
             self.render_size = None
             return
 
-        half_diag = vec3(-surf.get_width(), surf.get_height(), 0) / 2
-        world_half_diag = camera.rel_to_world(half_diag) - camera.position
+        # projected along with the whole scene if it's the same sprite
+        sprite_size = surf.get_size()
+        rect = None
+        if pos is self.position and sprite_size == self.sprite_size:
+            rect = self.projection
+        self.sprite_size = sprite_size
+
+        if rect is not None:
+            x, y, w, h = rect
+            if x != x:
+                # behind the camera
+                self.scene.remove(self)
+                return
+            pos_tl = vec2(x, y)
+            size = ivec2(int(w), int(h))
+        else:
+            half_diag = vec3(-surf.get_width(), surf.get_height(), 0) / 2
+            world_half_diag = camera.rel_to_world(half_diag) - camera.position
 
-        pos_tl = camera.world_to_screen(pos + world_half_diag)
-        pos_bl = camera.world_to_screen(pos - world_half_diag)
+            pos_tl = camera.world_to_screen(pos + world_half_diag)
+            pos_bl = camera.world_to_screen(pos - world_half_diag)
 
-        if None in (pos_tl, pos_bl):
-            # behind the camera
-            self.scene.remove(self)
-            return
+            if None in (pos_tl, pos_bl):
+                # behind the camera
+                self.scene.remove(self)
+                return
 
-        size = ivec2(pos_bl.xy - pos_tl.xy)
+            size = ivec2(pos_bl.xy - pos_tl.xy)
         self.render_size = size
 
         if not scale or 400 > size.x > 0 or big:
-            if scale:
-                # print(ivec2(size))
-                surf = pygame.transform.scale(surf, ivec2(size))
-
             # don't fade close sprites
             far = abs(pos.z - pp.z) > 1000
+            alpha = None  # not fogged
             if fade and far:
                 max_fade_dist = camera.screen_dist * FULL_FOG_DISTANCE
                 alpha = surf_fader(max_fade_dist, camera.distance(pos))
                 # If fade is integer make it bright faster
                 alpha = clamp(int(alpha * fade), 0, 255)
-                if surf.get_flags() & pygame.SRCALPHA:
-                    surf.fill((255, 255, 255, alpha), None, pygame.BLEND_RGBA_MULT)
-                else:
-                    surf.set_alpha(alpha)
-                    surf.set_colorkey(0)
             # if not far:
             #     if not 'Rain' in str(self) and not 'Rock' in str(self):
             #         print('skipped fade', self)
-            self.app.screen.blit(surf, ivec2(pos_tl))
+
+            screen = self.app.screen
+            if scale and (size.x > screen.get_width() or size.y > screen.get_height()):
+                # way bigger than the screen, only scale what shows
+                surf, pos_tl = self.app.sprites.clipped(
+                    surf, size, pos_tl, screen.get_rect(), alpha
+                )
+                if surf is None:
+                    return
+            else:
+                # scaled and faded copies are shared, see SpriteCache
+                surf = self.app.sprites.get(surf, size if scale else None, alpha)
+                if surf is None:
+                    return  # lost in the fog
+                if scale:
+                    # the cached size is rounded, keep the sprite centered
+                    pos_tl = pos_tl.xy + (vec2(size) - vec2(surf.get_size())) / 2
+            if self.batched:
+                self.scene.render_queue.append((surf, ivec2(pos_tl)))
+            else:
+                screen.blit(surf, ivec2(pos_tl))
 
         # if size.x > 150:
         #     self.scene.remove(self)
@@ -315,7 +381,16 @@ class Entity:
     # def __call__(self):
     #     pass
 
-    # NOTE: Implementing the below method automatically sets up collisions.
+    # NOTE: Implementing the below methods automatically sets up collisions.
 
+    # Called every frame while touching
     # def collision(self, other,  dt):
     #      pass
+
+    # Called once when we start touching
+    # def collision_enter(self, other,  dt):
+    #      pass
+
+    # Called once when we stop touching (or other was removed)
+    # def collision_leave(self, other):
+    #      pass
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Fonts and glyph atlases shared by everything that draws text.
+
+Sizes are rounded to one of a few FONT_SIZES, so text drawn at its
+projected size (powerups) doesn't load a new font for every size it
+goes through.  Each (file, size) is loaded once, with its GlyphAtlas.
+"""
+
+import os
+
+import pygame
+
+from game.base.glyphs import GlyphAtlas
+from game.constants import DEFAULT_FONT, FONT_SIZES, FONTS_DIR
+
+
+def quantize_size(size, sizes=FONT_SIZES):
+    """Closest of `sizes` to a font size (the smaller one on ties)"""
+    return min(sizes, key=lambda s: (abs(s - size), s))
+
+
+class FontService:
+    def __init__(self, sizes=FONT_SIZES, directory=FONTS_DIR):
+        """
+        :param sizes: the font sizes that are loaded
+        :param directory: where font files are looked for
+        """
+        self.sizes = tuple(sorted(sizes))
+        self.directory = directory
+        self.fonts = {}  # (filename, size) -> pygame.font.Font
+        self.atlases = {}  # (filename, size) -> GlyphAtlas
+        self.file_bytes = {}  # filename -> size of the file
+        self.loads = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.fonts)
+
+    def size(self, size):
+        """Size of the font actually used for `size`"""
+        return quantize_size(int(size), self.sizes)
+
+    def get(self, size, filename=DEFAULT_FONT):
+        """
+        The bold font closest to `size`, shared, don't change it.
+        :param filename: font file in the directory, None for pygame's default
+        """
+        key = (filename, self.size(size))
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+
+        self.loads += 1
+        fn = None
+        if filename is not None:
+            fn = os.path.join(self.directory, filename)
+            self.file_bytes[filename] = os.path.getsize(fn)
+        font = self.fonts[key] = pygame.font.Font(fn, key[1])
+        font.bold = True
+        return font
+
+    def glyphs(self, size, filename=DEFAULT_FONT):
+        """GlyphAtlas of get(size, filename)"""
+        key = (filename, self.size(size))
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = self.atlases[key] = GlyphAtlas(self.get(size, filename))
+        return atlas
+
+    @property
+    def bytes(self):
+        """Memory used: the font files and the rendered glyphs"""
+        files = sum(self.file_bytes[fn] for fn, _ in self.fonts if fn is not None)
+        return files + sum(atlas.bytes for atlas in self.atlases.values())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Glyph atlas of a font, so text is rendered once instead of every write.
+
+Every text (one character for terminals) is rendered once in white,
+colored copies are made by tinting it and kept in a small LRU,
+instead of calling font.render() for each character, color and shadow.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+COLOR_STEP = 4
+"""Colors are rounded to this step, so fading text reuses its glyphs"""
+
+
+def quantize_color(color):
+    """(r, g, b) of a color, rounded to COLOR_STEP"""
+    half = COLOR_STEP // 2
+    return tuple(
+        min(255, (int(color[i]) + half) // COLOR_STEP * COLOR_STEP) for i in range(3)
+    )
+
+
+def surface_bytes(surf):
+    w, h = surf.get_size()
+    return w * h * surf.get_bytesize()
+
+
+class GlyphAtlas:
+    def __init__(self, font, capacity=1024):
+        """
+        :param font: pygame.font.Font, the atlas is shared by its users
+        :param capacity: number of colored glyphs kept, and of white ones
+        """
+        self.font = font
+        self.capacity = capacity
+        self.glyphs = OrderedDict()  # text -> white surface
+        self.tinted = OrderedDict()  # (text, (r, g, b)) -> surface
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0  # of the white and colored glyphs
+
+    def __len__(self):
+        return len(self.tinted)
+
+    def glyph(self, text):
+        """White rendering of text, its alpha is the coverage"""
+        surf = self.glyphs.get(text)
+        if surf is not None:
+            self.glyphs.move_to_end(text)
+            return surf
+
+        surf = self.glyphs[text] = self.font.render(text, True, (255, 255, 255))
+        self.bytes += surface_bytes(surf)
+        if len(self.glyphs) > self.capacity:
+            _, old = self.glyphs.popitem(last=False)
+            self.bytes -= surface_bytes(old)
+        return surf
+
+    def get(self, text, color):
+        """
+        text rendered in color (shared, don't change it)
+        :param color: 0-255 color, the alpha is ignored like font.render()
+        """
+        key = (text, quantize_color(color))
+        surf = self.tinted.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.tinted.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = self.glyph(text).copy()
+        surf.fill((*key[1], 255), None, pygame.BLEND_RGBA_MULT)
+        self.tinted[key] = surf
+        self.bytes += surface_bytes(surf)
+        if len(self.tinted) > self.capacity:
+            _, old = self.tinted.popitem(last=False)
+            self.bytes -= surface_bytes(old)
+        return surf
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Palette animated gradients for the sky and the ground.
+
+The gradient is drawn once on an 8 bit surface: every pixel is the
+index of its row band and of one of a few noise colors, the colors
+themselves only live in the palette.  Changing the colors (fades) then
+rewrites 256 palette entries instead of redrawing and rescaling every
+pixel.
+"""
+
+import numpy as np
+import pygame
+
+
+class Gradient:
+    def __init__(self, size, scaled_size=None, bands=64, noise=4):
+        """
+        :param size: size the gradient is drawn at (one row per band at most)
+        :param scaled_size: size of the surface, the gradient is scaled to it
+        :param bands: number of color bands from top to bottom
+        :param noise: number of noise colors of each band
+        """
+        w, h = int(size[0]), int(size[1])
+        self.bands = max(1, min(bands, h, 256 // noise))
+        self.noise_colors = noise
+
+        band = np.arange(h) * self.bands // h
+        index = band[None, :] * noise + np.random.randint(noise, size=(w, h))
+        surf = pygame.Surface((w, h), 0, 8)
+        pygame.surfarray.blit_array(surf, index.astype(np.uint8))
+        if scaled_size is not None:
+            surf = pygame.transform.scale(surf, scaled_size)
+        self.surface = surf
+
+        # position of each band, from 0 (top) to 1 (bottom), like y / height
+        self.rows = np.bincount(band, np.arange(h)) / np.bincount(band) / h
+        self.noise = np.random.random((self.bands, noise, 3))
+        """Random numbers in [0, 1) to make the noise colors from"""
+
+    def recolor(self, colors, noise, alpha):
+        """
+        Set the colors of the gradient (a palette change)
+
+        :param colors: color of each band, 0-255
+        :param noise: noise colors of each band, 0-255 (bands x noise x 3)
+        :param alpha: opacity of the noise over each band, 0-1
+        """
+        colors = np.asarray(colors, float)[:, None, :3]
+        alpha = np.broadcast_to(np.asarray(alpha, float), (self.bands,))[:, None, None]
+        palette = colors * (1 - alpha) + np.asarray(noise, float) * alpha
+        palette = np.clip(palette, 0, 255).astype(int).reshape(-1, 3).tolist()
+        palette += [(0, 0, 0)] * (256 - len(palette))
+        self.surface.set_palette(palette)
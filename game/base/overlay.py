@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Static overlay layer of a scene (backdrop strips, frames...).
+
+Layers that don't change from one frame to the next are composited once
+into a cached SRCALPHA surface, which is then drawn with a single blits()
+call each frame, instead of blitting every layer every frame.
+"""
+
+import numpy as np
+import pygame
+
+
+class Overlay:
+    def __init__(self, size, scale=1):
+        """
+        :param size: size of the screen, layers are placed in this space
+        :param scale: pixels of the screen drawn on per unit of size
+            (see App.render_scale)
+        """
+        self.size = size
+        self.scale = scale
+        self.layers = []  # (surface, position)
+        self.surface = None  # composited layers, None when out of date
+        self.areas = []  # parts of the surface that are drawn on
+
+    def __len__(self):
+        return len(self.layers)
+
+    def add(self, surf, pos=(0, 0)):
+        """
+        Add a layer on top of the others.
+        Layers are drawn as they are now, call invalidate() after changing one.
+        :return: the layer, for remove()
+        """
+        layer = (surf, (int(pos[0]), int(pos[1])))
+        self.layers.append(layer)
+        self.invalidate()
+        return layer
+
+    def strip(self, pos, size, color, alpha=255):
+        """Add a rectangle of color, like the score backdrop"""
+        surf = pygame.Surface((int(size[0]), int(size[1])))
+        surf.set_alpha(alpha)
+        surf.fill(color)
+        return self.add(surf, pos)
+
+    def remove(self, layer):
+        self.layers.remove(layer)
+        self.invalidate()
+
+    def clear(self):
+        self.layers = []
+        self.invalidate()
+
+    def resize(self, size):
+        self.size = size
+        self.invalidate()
+
+    def invalidate(self):
+        self.surface = None
+
+    def composite(self):
+        """
+        Draw the layers onto the cached surface.
+        They are blended premultiplied by alpha, so overlapping layers look
+        the same as when drawn one by one, then divided back because plain
+        alpha blits are faster.
+        """
+        s = self.scale
+        w, h = int(self.size[0] * s), int(self.size[1] * s)
+        self.surface = pygame.Surface((w, h), pygame.SRCALPHA)
+        rects = []
+        for surf, pos in self.layers:
+            if s != 1:
+                lw, lh = surf.get_size()
+                surf = pygame.transform.scale(surf, (int(lw * s), int(lh * s)))
+                pos = (int(pos[0] * s), int(pos[1] * s))
+            if surf.get_masks()[3]:  # per-pixel alpha
+                layer = surf.copy()
+            else:
+                # surface alpha to per-pixel alpha
+                layer = pygame.Surface(surf.get_size(), pygame.SRCALPHA)
+                alpha = surf.get_alpha()
+                surf.set_alpha(None)
+                layer.blit(surf, (0, 0))
+                surf.set_alpha(alpha)
+                if alpha is not None:
+                    layer.fill((255, 255, 255, alpha), None, pygame.BLEND_RGBA_MULT)
+            layer = layer.premul_alpha()
+            self.surface.blit(layer, pos, None, pygame.BLEND_PREMULTIPLIED)
+            rects.append(pygame.Rect(pos, surf.get_size()).clip(self.surface.get_rect()))
+
+        rgb = pygame.surfarray.pixels3d(self.surface)
+        alpha = pygame.surfarray.pixels_alpha(self.surface)
+        shown = alpha > 0
+        a = alpha[shown][:, None].astype(np.uint32)
+        color = rgb[shown].astype(np.uint32)
+        rgb[shown] = np.minimum((color * 255 + a // 2) // a, 255)
+        del rgb, alpha  # unlock the surface
+
+        # merge the rects into bands so each pixel is drawn once
+        areas = []
+        for rect in sorted(rects, key=lambda r: r.y):
+            if areas and rect.y <= areas[-1].bottom:
+                areas[-1].union_ip(rect)
+            elif rect.w and rect.h:
+                areas.append(rect)
+        self.areas = areas
+
+    def render(self, screen):
+        if not self.layers:
+            return
+        if self.surface is None:
+            self.composite()
+        screen.blits([(self.surface, area.topleft, area) for area in self.areas], False)
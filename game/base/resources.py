@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+Cache of the loaded resources (images, sounds, animation frames...).
+
+It still behaves like the dict App.cache used to be (`in`, `[]`, `del`),
+but every entry has a category ("image", "sound", "frames" or "other")
+with its own byte budget, the least recently used ones are evicted when
+a category goes over it.  Evicted resources are just loaded again the
+next time they're asked for.
+
+Pinned entries are never evicted (the crosshair), and scoped entries
+belong to the level they were loaded in: they are released when the
+app enters another level or state (the boss, the level's enemies).
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+CATEGORIES = ("image", "sound", "frames", "other")
+
+
+def category_of(value):
+    """Category of a resource from its type"""
+    if isinstance(value, pygame.Surface):
+        return "image"
+    if pygame.mixer and isinstance(value, pygame.mixer.Sound):
+        return "sound"
+    if isinstance(value, (list, tuple)) and value:
+        if all(isinstance(v, pygame.Surface) for v in value):
+            return "frames"
+    return "other"
+
+
+def resource_bytes(value, category):
+    """Approximate memory used by a resource"""
+    if category == "image":
+        w, h = value.get_size()
+        return w * h * value.get_bytesize()
+    if category == "frames":
+        return sum(resource_bytes(v, "image") for v in value)
+    if category == "sound":
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return 0
+        freq, fmt, channels = mixer
+        return int(value.get_length() * freq * channels * (abs(fmt) // 8))
+    return 0
+
+
+class ResourceCache:
+    """
+    LRU cache of resources, keyed like App.load() keys
+    (filenames, (filename, scale, flipped), "ROCK"...).
+    """
+
+    def __init__(self, budgets):
+        """
+        :param budgets: category -> bytes kept at most, None for no limit
+        """
+        self.budgets = dict(budgets)
+        self.entries = OrderedDict()  # key -> (value, category, bytes, scope, pinned)
+        self.bytes = dict.fromkeys(CATEGORIES, 0)  # per category
+        self.scope = None
+        """Current level or state, scoped entries are tagged with it"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        value = self.entries[key][0]
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.store(key, value)
+
+    def __delitem__(self, key):
+        _, category, nbytes, _, _ = self.entries.pop(key)
+        self.bytes[category] -= nbytes
+
+    def get(self, key, default=None):
+        return self[key] if key in self.entries else default
+
+    def load(self, key, resource_func, category=None, scoped=False, pinned=False):
+        """
+        Get a resource, loading it with resource_func() if it's not cached
+        :param category: one of CATEGORIES, guessed from the resource if None
+        :param scoped: release it when leaving the current level (see enter())
+        :param pinned: never evict it
+        """
+        if key in self.entries:
+            return self[key]
+        return self.store(key, resource_func(), category, scoped, pinned)
+
+    def store(self, key, value, category=None, scoped=False, pinned=False):
+        """Add a resource (counted as a miss, it had to be loaded)"""
+        self.misses += 1
+        if key in self.entries:
+            del self[key]
+        category = category or category_of(value)
+        nbytes = resource_bytes(value, category)
+        scope = self.scope if scoped else None
+        self.entries[key] = (value, category, nbytes, scope, pinned)
+        self.bytes[category] += nbytes
+        self.evict(category, keep=key)
+        return value
+
+    def pin(self, key, pinned=True):
+        value, category, nbytes, scope, _ = self.entries[key]
+        self.entries[key] = (value, category, nbytes, scope, pinned)
+
+    def evict(self, category, keep=None):
+        """Drop the least recently used entries of a category above its budget"""
+        budget = self.budgets.get(category)
+        if budget is None:
+            return
+        for key in list(self.entries):
+            if self.bytes[category] <= budget:
+                break
+            _, cat, _, _, pinned = self.entries[key]
+            if cat == category and not pinned and key != keep:
+                del self[key]
+                self.evictions += 1
+
+    def enter(self, scope):
+        """
+        Start a new level (or state): release what the previous one loaded
+        as scoped, unless it's pinned
+        """
+        if scope != self.scope:
+            for key, (_, _, _, old, pinned) in list(self.entries.items()):
+                if old is not None and not pinned:
+                    del self[key]
+        self.scope = scope
+
+    def total_bytes(self):
+        return sum(self.bytes.values())
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = dict.fromkeys(CATEGORIES, 0)
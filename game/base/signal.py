@@ -50,6 +50,7 @@ class Slot:
         self.sig = weakref.ref(sig)
         self.once = False
         self.count = 0
+        self.dead = False  # disconnected, but not taken out of the list yet
 
     def __str__(self):
         return (
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Per-frame spatial index of the scene, for queries like
+"closest enemy in front of me" without scanning every slot.
+
+Positions are packed in numpy arrays sorted along z (depth is by far
+the longest axis of the world), so a query first narrows down to a
+z window with a binary search and then tests that window at once.
+"""
+
+import math
+
+import numpy as np
+
+
+class SpatialIndex:
+    def __init__(self):
+        self.entities = []
+        self.position = np.zeros((0, 3), np.float32)
+        self.extent = np.zeros(0, np.float32)  # half of the biggest side
+        self.z = self.position[:, 2]
+        self.max_extent = 0
+        self.type_masks = {}
+
+    def __len__(self):
+        return len(self.entities)
+
+    def rebuild(self, entities):
+        """Repack from the given entities (removed ones are skipped)"""
+
+        ents = [e for e in entities if e and not e.removed]
+        position = np.array(
+            [tuple(e.position) for e in ents], np.float32
+        ).reshape(-1, 3)
+        extent = np.array([max(e.size[0], e.size[1]) / 2 for e in ents], np.float32)
+
+        order = np.argsort(position[:, 2], kind="stable")
+        self.entities = [ents[i] for i in order.tolist()]
+        self.position = position[order]
+        self.extent = extent[order]
+        self.z = self.position[:, 2]
+        self.max_extent = float(self.extent.max()) if len(ents) else 0
+        self.type_masks = {}
+
+    def mask(self, types):
+        """Boolean mask of the entities that are instances of `types`"""
+        if types not in self.type_masks:
+            self.type_masks[types] = np.fromiter(
+                (isinstance(e, types) for e in self.entities),
+                np.bool_,
+                len(self.entities),
+            )
+        return self.type_masks[types]
+
+    def candidates(self, z_min, z_max, types=None):
+        """Indices of the entities between z_min and z_max"""
+        lo = np.searchsorted(self.z, z_min, "left")
+        hi = np.searchsorted(self.z, z_max, "right")
+        idx = np.arange(lo, hi)
+        if types is not None:
+            idx = idx[self.mask(types)[lo:hi]]
+        return idx
+
+    def results(self, idx, key, filter=None):
+        """Yield the live entities of idx sorted by key"""
+        for i in idx[np.argsort(key, kind="stable")].tolist():
+            e = self.entities[i]
+            if e.removed:
+                continue
+            if filter is None or filter(e):
+                yield e
+
+    def within(self, pos, radius, types=None, filter=None):
+        """
+        Entities whose position is within `radius` of `pos`, closest first
+        """
+        idx = self.candidates(pos[2] - radius, pos[2] + radius, types)
+        d = self.position[idx] - tuple(pos)
+        dist = np.sqrt((d * d).sum(axis=1))
+        keep = dist <= radius
+        return list(self.results(idx[keep], dist[keep], filter))
+
+    def nearest(
+        self,
+        pos,
+        types=None,
+        cone=None,
+        min_dist=0,
+        max_dist=math.inf,
+        scale=(1, 1, 1),
+        filter=None,
+    ):
+        """
+        Closest entity to `pos`.
+
+        :param cone: (direction, cos) only look at entities less than
+            acos(cos) away from direction
+        :param scale: per axis scale of the offsets before the cone test
+        :param filter: extra test on the entities, in order of distance
+        :return: entity or None
+        """
+        if max_dist < math.inf:
+            idx = self.candidates(pos[2] - max_dist, pos[2] + max_dist, types)
+        else:
+            idx = self.candidates(-math.inf, math.inf, types)
+
+        d = self.position[idx] - tuple(pos)
+        dist = np.sqrt((d * d).sum(axis=1))
+        keep = (min_dist < dist) & (dist < max_dist)
+
+        if cone is not None:
+            direction, cos = cone
+            scale = np.array(tuple(scale), np.float32)
+            v = np.array(tuple(direction), np.float32) * scale
+            v /= np.linalg.norm(v)
+            ds = d * scale
+            norm = np.linalg.norm(ds, axis=1)
+            norm[norm == 0] = 1
+            keep &= (ds @ v) / norm >= cos
+
+        return next(self.results(idx[keep], dist[keep], filter), None)
+
+    def raycast(
+        self,
+        origin,
+        direction,
+        max_dist,
+        types=None,
+        radius=0,
+        spread=0,
+        min_dist=0,
+        filter=None,
+    ):
+        """
+        Entities hit by the ray, closest first.
+
+        An entity is hit if it is closer to the ray than its half size plus
+        radius + spread * distance along the ray (so spread makes a cone,
+        e.g. a crosshair is a fixed size on screen).
+
+        :param direction: normalized direction of the ray
+        :return: list of (distance along the ray, entity)
+        """
+        origin = np.array(tuple(origin), np.float32)
+        direction = np.array(tuple(direction), np.float32)
+
+        z0 = origin[2]
+        z1 = z0 + direction[2] * max_dist
+        margin = self.max_extent + radius + spread * max_dist
+        idx = self.candidates(min(z0, z1) - margin, max(z0, z1) + margin, types)
+
+        d = self.position[idx] - origin
+        t = d @ direction
+        perp = d - t[:, None] * direction
+        perp = np.sqrt((perp * perp).sum(axis=1))
+        keep = (min_dist <= t) & (t <= max_dist)
+        keep &= perp <= self.extent[idx] + radius + spread * t
+
+        idx, t = idx[keep], t[keep]
+        order = np.argsort(t, kind="stable")
+        return [
+            (float(t[k]), self.entities[i])
+            for k, i in zip(order.tolist(), idx[order].tolist())
+            if not self.entities[i].removed
+            and (filter is None or filter(self.entities[i]))
+        ]
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+"""
+Cache of the scaled and fogged sprites drawn by Entity.render().
+
+Many entities share the same few source frames (butterflies, clouds...)
+and are drawn at similar sizes and fog, so the scaled and faded copies
+are kept and reused instead of being made again for every sprite every
+frame.
+
+Big sources (the boss, clouds loaded at scale 4) are first reduced
+with a power-of-two mip chain, so a small sprite never reads the whole
+source.  Sprites much bigger than the screen only scale the part that
+is visible (see clipped()).
+"""
+
+import math
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+
+def quantize(size):
+    """
+    Round a (w, h) size to one of 32 steps per doubling of the size,
+    so sprites at close depths share the same scaled surface.
+    The aspect ratio is kept (both sides use the same step).
+    """
+    w, h = int(size[0]), int(size[1])
+    step = 1 << max(0, max(w, h).bit_length() - 6)
+    return max(1, w // step * step), max(1, h // step * step)
+
+
+palettes = weakref.WeakKeyDictionary()
+"""8 bit surface -> the palette and colorkey given to set_palette()"""
+
+
+def set_palette(surf, palette, colorkey=None):
+    """
+    Change the palette of an 8 bit surface (e.g. the boss turning gray),
+    its scaled copies and those of its subsurfaces are then made again.
+    Use this instead of surf.set_palette() on anything that is rendered.
+    """
+    surf.set_palette(palette)
+    if colorkey is not None:
+        surf.set_colorkey(colorkey)
+    palettes[surf] = (tuple(map(tuple, palette)), colorkey)
+
+
+def surface_state(surf):
+    """
+    What can change in place on a surface and show in its scaled copies:
+    the palette and colorkey of 8 bit surfaces, as set by set_palette()
+    (looked up instead of reading the 256 colors back on every call)
+    """
+    if surf.get_bitsize() == 8:
+        return palettes.get(surf.get_abs_parent())
+    return None
+
+
+def half_size(surf):
+    """Next level of a mip chain"""
+    w, h = surf.get_size()
+    size = (max(1, w // 2), max(1, h // 2))
+    if surf.get_bitsize() >= 24:
+        return pygame.transform.smoothscale(surf, size)
+    return pygame.transform.scale(surf, size)
+
+
+def fade(surf, alpha):
+    """Fade a surface we own"""
+    if surf.get_flags() & pygame.SRCALPHA:
+        surf.fill((255, 255, 255, alpha), None, pygame.BLEND_RGBA_MULT)
+    else:
+        surf.set_alpha(alpha)
+        surf.set_colorkey(0)
+
+
+class SpriteCache:
+    """
+    LRU cache of scaled and fogged surfaces, keyed by
+    (source surface, quantized size, fog level).
+    Evicts the least recently used ones when above `budget` bytes.
+
+    Fog alpha is rounded to one of `fog_levels` levels (a quality knob),
+    each level being a pre-faded copy, so fogging a sprite is a lookup
+    instead of a pass over its pixels.
+    """
+
+    def __init__(self, budget, fog_levels=16):
+        self.budget = budget
+        self.fog_levels = fog_levels
+        self.entries = OrderedDict()  # key -> (source, surface, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def fog_level(self, alpha):
+        """Level (0: invisible, fog_levels - 1: opaque) of an alpha in 0-255"""
+        top = self.fog_levels - 1
+        return int(alpha * top / 255 + 0.5)
+
+    def lookup(self, key, surf):
+        entry = self.entries.get(key)
+        # check the source too, ids are reused once a surface is freed
+        if entry and entry[0] is surf:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def store(self, key, surf, result):
+        w, h = result.get_size()
+        nbytes = w * h * result.get_bytesize()
+        if nbytes > self.budget // 4:
+            return result  # huge (boss up close), would flush everything else
+        entry = self.entries.get(key)
+        if entry:
+            self.bytes -= entry[2]
+        self.entries[key] = (surf, result, nbytes)
+        self.entries.move_to_end(key)
+        self.bytes += nbytes
+
+        while self.bytes > self.budget and len(self.entries) > 1:
+            _, (_, _, n) = self.entries.popitem(last=False)
+            self.bytes -= n
+            self.evictions += 1
+
+        return result
+
+    def mip(self, surf, size, state=None):
+        """
+        Smallest power-of-two reduction of surf that is still at least
+        `size`, so the final scale reads as few pixels as possible.
+        """
+        w, h = surf.get_size()
+        level = 0
+        while w >= size[0] * 2 and h >= size[1] * 2 and min(w, h) > 1:
+            w, h = w // 2, h // 2
+            level += 1
+        return self.mip_level(surf, level, state)
+
+    def mip_level(self, surf, level, state=None):
+        if level == 0:
+            return surf
+        key = (id(surf), "mip", level, state)
+        result = self.lookup(key, surf)
+        if result is None:
+            result = half_size(self.mip_level(surf, level - 1, state))
+            result = self.store(key, surf, result)
+        return result
+
+    def get(self, surf, size=None, alpha=None):
+        """
+        surf scaled to (about) `size` (None to keep its size) and faded
+        to (about) `alpha`.
+        The result is shared, don't change it.
+        :param alpha: fog alpha, None if not in the fog. Fogged surfaces
+            without per-pixel alpha get a black colorkey, even when opaque.
+        :return: surface, None if it's completely faded out
+        """
+        top = self.fog_levels - 1
+        level = top if alpha is None else self.fog_level(alpha)
+        if level <= 0:
+            return None
+        keyed = alpha is not None and not surf.get_flags() & pygame.SRCALPHA
+        if size is not None:
+            size = quantize(size)
+        elif level == top and not keyed:
+            return surf
+
+        state = surface_state(surf)
+        key = (id(surf), size, level, keyed, state)
+        result = self.lookup(key, surf)
+        if result is not None:
+            return result
+
+        if level == top and not keyed:
+            result = pygame.transform.scale(self.mip(surf, size, state), size)
+        else:
+            result = self.get(surf, size).copy()
+            fade(result, level * 255 // top)
+        return self.store(key, surf, result)
+
+    def clipped(self, surf, size, pos, bounds, alpha=None):
+        """
+        Scale only the part of surf that lands inside `bounds` when drawn
+        at `pos` with `size`, for sprites much bigger than the screen.
+        Not cached, the visible part changes every frame.
+        :param alpha: fog alpha, None if not in the fog (see get())
+        :return: (surface, position), (None, None) if nothing shows
+        """
+        top = self.fog_levels - 1
+        level = top if alpha is None else self.fog_level(alpha)
+        if level <= 0:
+            return None, None
+
+        rect = pygame.Rect(int(pos[0]), int(pos[1]), int(size[0]), int(size[1]))
+        visible = rect.clip(bounds)
+        if not visible.w or not visible.h:
+            return None, None
+
+        # the visible rect in source pixels (rounded outward)
+        sw, sh = surf.get_size()
+        fx, fy = sw / rect.w, sh / rect.h
+        x0 = math.floor((visible.x - rect.x) * fx)
+        y0 = math.floor((visible.y - rect.y) * fy)
+        x1 = math.ceil((visible.right - rect.x) * fx)
+        y1 = math.ceil((visible.bottom - rect.y) * fy)
+        src = pygame.Rect(x0, y0, x1 - x0, y1 - y0).clip(surf.get_rect())
+        if not src.w or not src.h:
+            return None, None
+
+        out = (max(1, round(src.w / fx)), max(1, round(src.h / fy)))
+        part = pygame.transform.scale(surf.subsurface(src), out)
+        keyed = alpha is not None and not surf.get_flags() & pygame.SRCALPHA
+        if level < top or keyed:
+            fade(part, level * 255 // top)
+        return part, (rect.x + src.x / fx, rect.y + src.y / fy)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
@@ -41,10 +41,14 @@ Z = glm.vec3(0, 0, 1)
 
 EPSILON = 0.0001  # for floating point comparisons
 GROUND_HEIGHT = -300
+GROUND_STRIPS = 64
+"""
+Most column strips the ground is blitted in when the camera rolls,
+steeper rolls draw it as a textured polygon
+"""
 PLAYER_SPEED = glm.vec3(150, 150, -400)
 BULLET_SPEED = 15000
 LASER_SPEED = 45000
-BULLET_SIZE = 200
 BULLET_OFFSET = glm.vec3(0, -20, -300)
 CAMERA_OFFSET = glm.vec3(0, 0, 300)
 SCREEN_DIST = 3000
@@ -59,3 +63,55 @@ BUTTERFLY_MIN_SHOOT_DIST = 1500
 DEBUG = False
 """For abusing prints. Finding info will require grepping"""
 ENEMY_BULLET_FACTOR = 1 / 6
+FIXED_TIMESTEP = 0
+"""
+Length of a simulation step in seconds (e.g. 1 / 120).
+The game then updates at that fixed rate and renders in between,
+interpolating positions.  0 updates once per frame with the frame time.
+"""
+MAX_FIXED_STEPS = 5
+"""Most fixed steps run in one frame, any extra time is dropped"""
+MAX_FPS = 0
+"""Frame limiter (sleeps between frames), 0 for no limit"""
+SPRITE_CACHE_BUDGET = 32 * 1024 * 1024
+"""Bytes of scaled sprites kept around by the SpriteCache"""
+RESOURCE_BUDGETS = {
+    "image": 64 * 1024 * 1024,
+    "frames": 16 * 1024 * 1024,
+    "sound": 32 * 1024 * 1024,
+    "other": None,
+}
+"""Bytes of each category of resources kept by App.cache (None: no limit)"""
+FOG_LEVELS = 16
+"""Number of fog alpha levels, each one is a pre-faded copy of the sprites"""
+RENDER_SCALE = 1
+"""
+Resolution of the world render relative to the window (e.g. 0.5, 0.75).
+Below 1 the world is drawn offscreen and upscaled once per frame.
+"""
+NATIVE_HUD = True
+"""With RENDER_SCALE below 1, draw the terminals at the window resolution"""
+CULL_AI = False
+"""Skip the AI of entities culled from the last frame (off screen or fogged)"""
+FONT_SIZES = (8, 12, 16, 24, 32, 48, 64)
+"""Font sizes loaded by the FontService, other sizes use the closest one"""
+DEFAULT_FONT = "PressStart2P-Regular.ttf"
+
+# Collision layers (bit flags)
+# An entity sits on collision_layer and only has its collision() called
+# for others whose layer is in its collision_mask.
+LAYER_DEFAULT = 1 << 0
+LAYER_PLAYER = 1 << 1
+LAYER_PLAYER_BULLET = 1 << 2
+LAYER_ENEMY = 1 << 3
+LAYER_ENEMY_BULLET = 1 << 4
+LAYER_PICKUP = 1 << 5
+LAYER_HAZARD = 1 << 6
+LAYER_ALL = (1 << 7) - 1
+
+COLLISION_BROADPHASE = "batch"
+"""
+How the scene finds colliding pairs (see game/base/collision.py):
+"batch" for a vectorized test over a packed numpy table,
+"sweep" for sort-and-sweep along z, "brute" to test every pair.
+"""
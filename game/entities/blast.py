@@ -16,6 +16,10 @@ class Blast(Entity):
     A visual blast radius from Buttabomber
     """
 
+    collision_layer = LAYER_HAZARD
+    collision_mask = LAYER_PLAYER
+    batched = False  # draws a circle
+
     def __init__(self, app, scene, radius, color="white", damage=1, spread=1, **kwargs):
         super().__init__(app, scene, **kwargs)
 
@@ -30,14 +34,12 @@ class Blast(Entity):
         if self.damage:
             self.play_sound("explosion.wav")
 
+        if not self.damage:
+            self.collision_mask = 0  # just visual
+
         self.collision_size = self.size = vec3(radius)
         self.font_size = ivec2(24, 24)
-        font_fn = "data/PressStart2P-Regular.ttf"
-
-        self.font = self.app.load(
-            font_fn + ":" + str(self.font_size.y),
-            lambda: pygame.font.Font(font_fn, self.font_size.y, bold=True),
-        )
+        self.font = self.app.fonts.get(self.font_size.y)
         self.solid = True
 
         # self.play_sound("hurt.wav")
@@ -46,12 +48,12 @@ class Blast(Entity):
         super().update(t)
         self.radius += t * self.spread
 
-    def collision(self, other, dt):
+    def collision_enter(self, other, dt):
         from game.entities.player import Player
 
         # enemy vs player or player vs enemy?
         if isinstance(other, Player):
-            # warning: this would trigger every frame if player didn't have blink
+            # only once per contact, not every frame of the overlap
             other.hurt(self.damage, self, self.parent)
 
     def render(self, camera):
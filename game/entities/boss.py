@@ -7,6 +7,7 @@ import math
 
 from game.base.enemy import Enemy
 from game.base.entity import Entity
+from game.base.sprites import set_palette
 from game.constants import Y, SPRITES_DIR, ORANGE, GRAY
 from game.entities.ai import AI
 from game.entities.butterfly import Butterfly
@@ -64,7 +65,7 @@ class Boss(Enemy):
 
         # load an image if its not already in the cache, otherwise grab it
 
-        self.app.cache[cache_id] = frames
+        self.app.cache.store(cache_id, frames, scoped=True)
         return frames
 
     def get_animation(self, color):
@@ -75,7 +76,7 @@ class Boss(Enemy):
         if "BOSS" not in self.app.cache:
             image = pygame.image.load(filename)
             image = pygame.transform.scale(image, ivec2(1024))
-            self.app.cache["BOSS"] = image
+            self.app.cache.store("BOSS", image, scoped=True)
         else:
             image = self.app.cache["BOSS"]
 
@@ -85,8 +86,7 @@ class Boss(Enemy):
 
         palette = [(1, 0, 1), (0, 0, 0), brighter, darker, very_darker]
 
-        image.set_palette(palette)
-        image.set_colorkey((1, 0, 1))  # index 0
+        set_palette(image, palette, (1, 0, 1))  # colorkey: index 0
 
         self.width = image.get_width() // self.NB_FRAMES
         self.height = image.get_height()
@@ -8,6 +8,8 @@ from game.constants import *
 
 
 class Bullet(Entity):
+    swept = True  # too fast to only check where it is, see Entity.sweep()
+
     def __init__(
         self,
         app,
@@ -33,9 +35,15 @@ class Bullet(Entity):
         )
         self.damage = damage
         self.solid = True
-        self.size.z = BULLET_SIZE  # to prevent tunneling
         self.parent = parent  # whoever shot the bullet
 
+        if parent.friendly:
+            self.collision_layer = LAYER_PLAYER_BULLET
+            self.collision_mask = LAYER_ENEMY
+        else:
+            self.collision_layer = LAYER_ENEMY_BULLET
+            self.collision_mask = LAYER_PLAYER
+
     def collision(self, other, dt):
         # enemy vs player or player vs enemy?
         if isinstance(other, Being):
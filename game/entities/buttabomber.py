@@ -1,6 +1,7 @@
 from os import path
 
 from game.base.enemy import Enemy
+from game.base.sprites import set_palette
 from game.constants import *
 from game.entities.camera import Camera
 from game.entities.blast import Blast
@@ -68,8 +69,7 @@ class ButtaBomber(Enemy):
 
         palette = [(1, 0, 1), (0, 0, 0), brighter, darker, very_darker]
 
-        image.set_palette(palette)
-        image.set_colorkey((1, 0, 1))  # index 0
+        set_palette(image, palette, (1, 0, 1))  # colorkey: index 0
 
         self.width = image.get_width() // self.NB_FRAMES
         self.height = image.get_height()
@@ -79,7 +79,7 @@ class ButtaBomber(Enemy):
             for i in range(self.NB_FRAMES)
         ]
 
-        self.app.cache[cache_id] = frames
+        self.app.cache.store(cache_id, frames, scoped=True)
         return frames
 
     # def fall(self):
@@ -1,6 +1,7 @@
 from os import path
 
 from game.base.enemy import Enemy
+from game.base.sprites import set_palette
 from game.constants import *
 from game.entities.camera import Camera
 from game.util import *
@@ -53,8 +54,7 @@ class Butterfly(Enemy):
 
         palette = [(1, 0, 1), (0, 0, 0), brighter, color, darker, very_darker]
 
-        image.set_palette(palette)
-        image.set_colorkey((1, 0, 1))  # index 0
+        set_palette(image, palette, (1, 0, 1))  # colorkey: index 0
 
         self.width = image.get_width() // self.NB_FRAMES
         self.height = image.get_height()
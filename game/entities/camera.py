@@ -3,6 +3,7 @@ from math import pi
 from typing import Union
 
 import glm
+import numpy as np
 from glm import dot, cross, vec3, vec2, normalize, rotate, identity, quat
 from pygame import Vector3
 
@@ -17,6 +18,8 @@ class Camera(Entity):
     All the coordinates are in pixels.
     """
 
+    renderable = False
+
     def __init__(
         self,
         app,
@@ -37,13 +40,45 @@ class Camera(Entity):
         super().__init__(app, scene)
         self.screen_size = screen_size
         self.screen_dist = screen_dist
+        # screen pixels per unit of screen_size (see App.render_scale)
+        self.scale = app.render_scale if app else 1
+        self._basis = None  # cached (horizontal, up, direction), see basis()
         self.up = normalize(up)
         self.direction = normalize(direction)
         self.position = position
 
+    @property
+    def up(self):
+        return self._up
+
+    @up.setter
+    def up(self, v):
+        self._up = v
+        self._basis = None
+
+    @property
+    def direction(self):
+        return self._direction
+
+    @direction.setter
+    def direction(self, v):
+        self._direction = v
+        self._basis = None
+
+    def basis(self):
+        """
+        (horizontal, up, direction), recomputed only after the camera turned
+        :return: the three glm vectors and a 3x3 numpy array of them
+        """
+        if self._basis is None:
+            horizontal = cross(self._direction, self._up)
+            vectors = (horizontal, self._up, self._direction)
+            self._basis = vectors, np.array([tuple(v) for v in vectors])
+        return self._basis
+
     @property
     def horizontal(self):
-        return cross(self.direction, self.up)
+        return self.basis()[0][0]
 
     def update_pos(self, player):
         """Set the camera position to have the player in center"""
@@ -80,8 +115,35 @@ class Camera(Entity):
 
         pos.y = self.screen_size.y - pos.y
 
+        if self.scale != 1:
+            pos *= self.scale
         return pos
 
+    def project_many(self, positions, half_sizes):
+        """
+        Project sprites in one numpy pass, what world_to_screen() does
+        to both corners of each sprite in Entity.render().
+
+        :param positions: (n, 3) world positions of the sprite centers
+        :param half_sizes: (n, 2) half width and height of the sprites
+        :return: (rects, visible)
+            rects: (n, 4) screen x, y, w, h; NaNs for what's behind the camera
+            visible: (n,) in front of the camera and touching the screen
+        """
+        sw, sh = self.screen_size * self.scale
+        with np.errstate(invalid="ignore", divide="ignore"):
+            local = (positions - tuple(self.position)) @ self.basis()[1].T
+            dist = local[:, 2]
+            front = dist >= 10
+            k = np.where(front, self.screen_dist * self.scale / dist, np.nan)
+            w = 2 * half_sizes[:, 0] * k
+            h = 2 * half_sizes[:, 1] * k
+            x = local[:, 0] * k + (sw - w) / 2
+            y = sh / 2 - local[:, 1] * k - h / 2
+            rects = np.stack((x, y, w, h), axis=1)
+            visible = front & (x < sw) & (x + w > 0) & (y < sh) & (y + h > 0)
+        return rects, visible
+
     def rel_to_world(self, rel):
         """
         Convert a vector relative to the camera to the world system.
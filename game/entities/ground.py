@@ -5,33 +5,33 @@ import pygame
 import pygame.gfxdraw
 from glm import vec3, vec4
 import glm
+import math
 import random
 
-from game.constants import FULL_FOG_DISTANCE, GREEN, EPSILON
+from game.constants import FULL_FOG_DISTANCE, GREEN, EPSILON, GROUND_STRIPS
 from game.entities.camera import Camera
 from game.util import *
 
 from game.base.entity import Entity
+from game.base.gradient import Gradient
 
 
 class Ground(Entity):
+    batched = False  # draws a polygon
+
     def __init__(self, app, scene, height):
         super().__init__(app, scene)
         self.position = vec3(0, height, float("-inf"))
         self._color = pg_color(GREEN)
-        self.delay = 0.5
-        self.delay_t = 0  # time until next redraw
+        self.gradient = None
+        self._polygon_key = None
+        self._polygon = None, None
         self.color = GREEN
 
     def fade_opt(self, c):
         """
-        Sets color only if it hasn't change for self.delay seconds
+        Sets color (cheap, only changes the palette)
         """
-        if self.delay_t > EPSILON:
-            return False
-
-        self.delay_t = self.delay
-
         self.color = c
         return True
 
@@ -41,28 +41,41 @@ class Ground(Entity):
 
     @color.setter
     def color(self, c):
-        self.texture = pygame.Surface(self.app.size / 8).convert()
-        width, height = self.texture.get_size()
+        # drawn once, then only the palette changes (see Gradient)
+        if not self.gradient:
+            size = self.app.render_size
+            self.gradient = Gradient(size / 8, size)
+        self.texture = self.gradient.surface
 
         ground = self._color = pg_color(c)
         sky = self.scene.sky_color or ncolor("blue")
 
-        # Draw gradient
-        for y in range(height):
-            interp = (1 - y / height) * 2
+        # Gradient
+        colors = []
+        for y in self.gradient.rows:
+            interp = (1 - y) * 2
             base = rgb_mix(ground, sky, interp)
-            pygame.draw.line(self.texture, base, (0, y), (width, y))
-
-        noise = noise_surf(self.texture.get_size(), random.randrange(5))
-        self.texture.blit(noise, (0, 0))
-        self.texture = pygame.transform.scale(self.texture, self.app.size)
+            colors.append([int(base[i]) for i in range(3)])
 
-    def update(self, t):
-        super().update(t)
-        self.delay_t = max(0, self.delay_t - t)
+        # Noise (see noise_surf)
+        noise = self.gradient.noise * 255
+        self.gradient.recolor(colors, noise, 12 / 255)
 
-    def render(self, camera: Camera):
-        super().render(camera)
+    def polygon(self, camera: Camera):
+        """
+        Screen polygon of the ground and the blits drawing it in strips
+        when the horizon is near level (None otherwise).
+        Cached as long as the camera doesn't turn or move up and down.
+        """
+        key = (
+            tuple(camera.up),
+            tuple(camera.direction),
+            camera.position.y,
+            tuple(camera.screen_size),
+        )
+        if key == self._polygon_key:
+            return self._polygon
+        self._polygon_key = key
 
         # We check whether each corner of the screen is behind the ground
         world_center = (
@@ -86,6 +99,7 @@ class Ground(Entity):
         ]
 
         poly = []
+        horizon = []  # (edge, intersection)
         for i in range(4):
             a, ag = points[i], bellow_ground[i]
             b, bg = points[i - 1], bellow_ground[i - 1]
@@ -96,10 +110,70 @@ class Ground(Entity):
                 v = b - a
                 inter = a + v * (self.position.y - a.y) / v.y
                 poly.append(inter)
+                horizon.append((i, inter))
 
             if ag:
                 poly.append(a)
 
+        strips = None
         if len(poly) > 2:
             poly = [tuple(camera.world_to_screen(p)) for p in poly]
+            if all(bellow_ground):
+                strips = self.strips(camera.screen_size * camera.scale, None)
+            elif sorted(i for i, p in horizon) == [0, 2]:
+                # the horizon crosses the left (0) and right (2) edges
+                ground = points[bellow_ground.index(True)]
+                strips = self.strips(
+                    camera.screen_size * camera.scale,
+                    [camera.world_to_screen(p) for i, p in horizon],
+                    camera.world_to_screen(ground),
+                )
+        else:
+            poly = None
+
+        self._polygon = poly, strips
+        return self._polygon
+
+    def strips(self, size, horizon, ground=None):
+        """
+        Blits of the texture for the ground under (or over) a near level
+        horizon: column strips narrow enough to be at most a pixel off
+        the horizon.
+        :param horizon: two screen points of the horizon, None if the
+            ground covers the screen
+        :param ground: screen point on the ground side of the horizon
+        :return: list of (texture, position, area), None if it's too steep
+        """
+        w, h = int(size[0]), int(size[1])
+        if horizon is None:
+            return [(self.texture, (0, 0), (0, 0, w, h))]
+
+        a, b = sorted(horizon, key=lambda p: p.x)
+        if b.x - a.x < EPSILON:
+            return None
+        slope = (b.y - a.y) / (b.x - a.x)
+        n = max(1, math.ceil(w * abs(slope)))
+        if n > GROUND_STRIPS:
+            return None
+
+        below = ground.y > a.y + slope * (ground.x - a.x)
+        strips = []
+        for k in range(n):
+            x0, x1 = w * k // n, w * (k + 1) // n
+            y = int(round(a.y + slope * ((x0 + x1) / 2 - a.x)))
+            y = min(max(y, 0), h)
+            if below:
+                area = (x0, y, x1 - x0, h - y)
+            else:
+                area = (x0, 0, x1 - x0, y)
+            strips.append((self.texture, area[:2], area))
+        return strips
+
+    def render(self, camera: Camera):
+        super().render(camera)
+
+        poly, strips = self.polygon(camera)
+        if strips:
+            self.app.screen.blits(strips, False)
+        elif poly:
             pygame.gfxdraw.textured_polygon(self.app.screen, poly, self.texture, 0, 0)
@@ -37,21 +37,20 @@ class Message(Entity):
     def font_size(self, value):
         self._font_size = value
 
-        font_fn = "data/PressStart2P-Regular.ttf"
-        self.font = self.app.load(
-            font_fn + ":" + str(self.font_size.y),
-            lambda: pygame.font.Font(font_fn, self.font_size.y, bold=True),
-        )
+        # the closest loaded size, powerups set their projected size every frame
+        self.font = self.app.fonts.get(value.y)
+        self.glyphs = self.app.fonts.glyphs(value.y)
 
     def set(self, text, color):
         self.text = text
         self.size = vec3(24 * len(text), 24, 24)
         self.color = pg_color(color)
 
+        # shared with the other messages, see GlyphAtlas
         self.surfaces = [
-            self.font.render(text, True, self.shadow2_color),
-            self.font.render(text, True, self.shadow_color),
-            self.font.render(text, True, self.color),
+            self.glyphs.get(text, self.shadow2_color),
+            self.glyphs.get(text, self.shadow_color),
+            self.glyphs.get(text, self.color),
         ]
 
         self.offsets = [vec3(2, -2, 0), vec3(-2, 3, 0), vec3(0, 0, 0)]
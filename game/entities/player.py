@@ -23,6 +23,11 @@ from game.util import ncolor
 
 
 class Player(Being):
+    batched = False  # the crosshair goes on top of the ship
+    collision_layer = LAYER_PLAYER
+    # bullets and blasts do the hurting themselves
+    collision_mask = LAYER_ENEMY | LAYER_PICKUP
+
     def __init__(self, app, scene, speed=PLAYER_SPEED, level=0):
         super().__init__(app, scene, filename=SHIP_IMAGE_PATH)
         self.game_state = self.scene.state
@@ -34,9 +39,15 @@ class Player(Being):
 
         self.max_hp = self.hp = 3
         self.friendly = True  # determines what Beings you can damage
-        self.crosshair_surf: SurfaceType = app.load_img(CROSSHAIR_IMAGE_PATH, 3)
-        self.crosshair_surf_green = app.load_img(CROSSHAIR_GREEN_IMAGE_PATH, 3)
+        self.crosshair_surf: SurfaceType = app.load_img(
+            CROSSHAIR_IMAGE_PATH, 3, pinned=True
+        )
+        self.crosshair_surf_green = app.load_img(
+            CROSSHAIR_GREEN_IMAGE_PATH, 3, pinned=True
+        )
         self.crosshair_scale = 1
+        self._crosshair_time = None  # scene time of the last crosshair query
+        self._crosshair_enemy = None
 
         self.slots += [
             self.app.inputs["hmove"].always_call(self.set_vel_x),
@@ -168,7 +179,7 @@ class Player(Being):
         # # self.smoke_event = scene.when.every(1, self.smoke)
         # return damage
 
-    def collision(self, other, dt):
+    def collision_enter(self, other, dt):
         if isinstance(other, Enemy) and not isinstance(other, Boss):
             if other.alive:
                 self.hurt(other.hp, None, other)
@@ -188,25 +199,27 @@ class Player(Being):
             other.remove()
 
     def find_enemy_in_crosshair(self):
+        # called from both render() and fire(), so only look once per frame
+        if self._crosshair_time == self.scene.time:
+            return self._crosshair_enemy
+
         # Assuming state is Game
         camera = self.app.state.camera
-        screen_center = camera.screen_size / 2
         crosshair_radius = self.crosshair_surf.get_width() / 2
 
-        # Entities are sorted from far to close and we want the closest
-        for entity in reversed(self.scene.slots):
-            entity = entity.get()
-            if (
-                isinstance(entity, Enemy)
-                and camera.distance(entity.position) < AIM_MAX_DIST
-            ):
-                center = camera.world_to_screen(entity.position)
-                if (
-                    center
-                    and length(center - screen_center)
-                    < crosshair_radius + entity.render_size.x / 2
-                ):
-                    return entity
+        # The crosshair is a cone of the same size on the screen whatever
+        # the distance, hits are sorted from close to far
+        hits = self.scene.raycast(
+            camera.position,
+            camera.direction,
+            AIM_MAX_DIST,
+            Enemy,
+            spread=crosshair_radius / camera.screen_dist,
+            min_dist=10,
+        )
+        self._crosshair_time = self.scene.time
+        self._crosshair_enemy = hits[0][1] if hits else None
+        return self._crosshair_enemy
 
     def write_weapon_stats(self):
         if not self.alive:
@@ -411,7 +424,7 @@ class Player(Being):
                 img = pygame.transform.rotate(img, rot)
 
             nrect = (rect[0], rect[1], *sz)
-            self.app.screen.blit(img, nrect)
+            self.app.blit_scaled(img, nrect)
 
         # Crosshair
         if self.alive:
@@ -425,8 +438,8 @@ class Player(Being):
                 img = pygame.transform.scale(self.crosshair_surf_green, sz)
                 rect[2] -= round(sz.x / 2)
                 rect[3] -= round(sz.y / 2)
-                self.app.screen.blit(img, rect)
+                self.app.blit_scaled(img, rect)
             else:
                 if self.targeting:
                     self.targeting = False  # triggers
-                self.app.screen.blit(self.crosshair_surf, rect)
+                self.app.blit_scaled(self.crosshair_surf, rect)
@@ -12,6 +12,9 @@ from game.constants import *
 
 
 class Powerup(Message):
+    collision_layer = LAYER_PICKUP
+    collision_mask = LAYER_PLAYER
+
     def __init__(self, app, scene, letter, **kwargs):
         self.letter = letter
         color = None
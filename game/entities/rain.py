@@ -12,6 +12,8 @@ from game.constants import *
 
 
 class Rain(Entity):
+    cullable = False  # not scaled, the projected rect isn't its size
+
     def __init__(self, app, scene, pos: vec3, z_vel: float, **kwargs):
 
         super().__init__(app, scene, None, position=pos, **kwargs)
@@ -12,6 +12,8 @@ from game.constants import *
 
 
 class Rock(Entity):
+    fog = False  # rendered without fading
+
     def __init__(self, app, scene, pos: vec3, z_vel: float, **kwargs):
 
         super().__init__(app, scene, None, position=pos, velocity=Z * 1000, **kwargs)
@@ -27,7 +29,8 @@ class Rock(Entity):
                 self._surface.fill(pg_color(glm.mix(ncolor("black"), gcolor, 0.4)))
                 # self._surface.fill((0,0,0))
 
-                self.app.cache["ROCK"] = self._surface
+                # the color of the level's ground
+                self.app.cache.store("ROCK", self._surface, scoped=True)
 
                 # self.velocity = Z * 10000 + z_vel
             else:
@@ -9,6 +9,8 @@ from game.constants import CLOUD_IMAGE_PATHS
 
 
 class Star(Entity):
+    cullable = False  # not scaled, the projected rect isn't its size
+
     def __init__(self, app, scene, pos: vec3, z_vel: float):
         vel = vec3(0, 0, z_vel)
 
@@ -1,63 +1,55 @@
 #!/usr/bin/python
 
-import random
-
+import numpy as np
 import pygame
 from glm import ivec2, ivec4, vec4
 
 from game.base.entity import Entity
-from game.constants import FONTS_DIR
+from game.base.glyphs import quantize_color
+from game.constants import NATIVE_HUD
 from game.util import ncolor, pg_color
-from os import path
-
 
-class Char:
-    def __init__(
-        self, text, imgs, pos=ivec2(0, 0), color=(255, 255, 255, 0), offset=ivec2(0, 0),
-    ):
-        self.imgs = imgs
-        self.text = text
-        self.pos = pos
-        self.color = color
-        self.offset = offset
+# pixels drawn around a cell (shadows)
+MARGIN = 4
+# above this many changed cells, redraw the whole terminal
+MAX_DIRTY_CELLS = 64
 
 
 class Terminal(Entity):
+    batched = False
+
     def __init__(self, app, scene, size=None):
         super().__init__(app, scene)
 
         self.app = app
         self.scene = scene
 
-        self.font_size = ivec2(size or 24)
+        # cells are the size of the font actually loaded
+        self.font_size = ivec2(app.fonts.size(size or 24))
         self.spacing = ivec2(0)
-        font_fn = path.join(FONTS_DIR, "PressStart2P-Regular.ttf")
-
-        # load the font if its not already loaded (cacheble)
-        # we're appending :16 to cache name since we may need to cache
-        # different sizes in the future
-        self.font = self.app.load(
-            (font_fn, self.font_size.y),
-            lambda: pygame.font.Font(font_fn, self.font_size.y, bold=True),
-        )
+        self.font = app.fonts.get(self.font_size.y)
+        # characters rendered once, shared by the terminals of this size
+        self.glyphs = app.fonts.glyphs(self.font_size.y)
 
         # terminal size in characters
         self.size = app.size / (self.font_size + self.spacing)
 
-        # dirty flags for lazy redrawing
+        # the cells: character code (0 if empty), packed rgb color, offset
+        shape = (self.size.y, self.size.x)
+        self.chars = np.zeros(shape, np.int32)
+        self.colors = np.zeros(shape, np.int32)
+        self.offsets = np.zeros(shape + (2,), np.int32)
+
+        # the cells as drawn on self.surface, to redraw only what changed
+        self.drawn = None
         self.dirty = True
-        self.dirty_line = [True] * self.size.y  # dirty flags per line
 
         self._offset = ivec2(0, 0)
 
-        # 2d array of pygame text objects
-        self.chars = []
-        for y in range(self.size.y):
-            self.chars.append([None] * self.size.x)
-
         self.surface = pygame.Surface(
             self.app.size, pygame.SRCALPHA, 32
         ).convert_alpha()
+        self.scaled = None  # surface at the render scale, without NATIVE_HUD
 
         self.bg_color = ivec4(255, 255, 255, 0)  # transparent by default
         self.shadow_color = ivec4(120, 120, 120, 0)
@@ -73,20 +65,13 @@ class Terminal(Entity):
         """
 
         if pos is None:  # clear whole screen
-            for x in range(self.size[1]):
-                self.clear(x)
-            return
-
-        # if pos is int, clear that terminal row
-        if isinstance(pos, int):
-            for x in range(self.size.x):
-                self.clear((x, pos))
-            return
-
-        # clear the character at pos (x,y)
-        # we use indices instead of .x .y since pos could be tuple/list
-        self.chars[pos[1]][pos[0]] = None
-        self.dirty_line[pos[1]] = True
+            self.chars[:] = 0
+        elif isinstance(pos, int):  # clear that terminal row
+            self.chars[pos] = 0
+        else:
+            # clear the character at pos (x,y)
+            # we use indices instead of .x .y since pos could be tuple/list
+            self.chars[pos[1], pos[0]] = 0
         self.dirty = True
 
     def offset(self, pos=(0, 0), offset=None):
@@ -94,26 +79,27 @@ class Terminal(Entity):
         if offset is None:
             # no ofs parameter? move entire terminal by offset (stored in pos now)
             self._offset = pos
+            self.drawn = None  # everything moves
             self.dirty = True
             return
 
         if isinstance(pos, int):  # row
-            for i in range(self.size.x):
-                self.offset((pos, i), offset)
+            self.offsets[pos] = offset
+            self.dirty = True
             return
 
         try:
-            ch = self.chars[pos[1]][pos[0]]
+            self.offsets[pos[1], pos[0]] = offset
         except IndexError:
             # outside of screen
-            # print(pos)
             return
+        self.dirty = True
 
-        # offset char at position
-        if ch:
-            self.write(
-                ch.text, ch.pos, ch.color, offset=offset, align=-1, length=0,
-            )
+    def cell(self, pos):
+        """(x, y) cell of a position, a number being a row"""
+        if isinstance(pos, (int, float)):
+            return 0, int(pos)
+        return int(pos[0]), int(pos[1])
 
     def write(
         self,
@@ -124,70 +110,79 @@ class Terminal(Entity):
         align=-1,
         length=0,
     ):
+        """
+        Write text (can be several lines) at pos, in one pass.
+        Negative positions count from the right and bottom.
 
-        if isinstance(pos, (int, float)):
-            pos = ivec2(0, pos)
-        else:
-            # if decimal number, proportional to terminal size
-            # if isinstance(pos[0], float):
-            #     if  0 < pos[0] < 1 or 0 < pos[0] < 1:
-            #         pos = ivec2(pos[0] * self.size[0], pos[1] * self.size[1])
-            #     else:
-            #         pos = ivec2(pos[0], pos[1])
-            # else:
-            pos = ivec2(pos[0], pos[1])
-
-        length = max(length, len(text))
+        :param align: -1 left, 0 centered on pos, 1 right
+        :param length: align as if the text was at least this long
+        """
+        x, y = self.cell(pos)
+        lines = text.split("\n")
+        length = max(length, *map(len, lines))
 
         # Do alignment (-1, 0, 1)
         if align == 0:  # center
-            return self.write(
-                text, (pos[0] - length / 2, pos[1]), color, offset, -1, length
-            )
+            x = int(x - length / 2)
         elif align == 1:  # right
-            return self.write(
-                text, (pos[0] + length, pos[1]), color, offset, -1, length
-            )
-
-        assert align == -1  # left
-
-        if "\n" in text:
-            lines = text.split("\n")
-            for i, line in enumerate(lines):
-                self.write(
-                    text, ivec2(pos[0], pos[1] + i), color, offset, align, length
-                )
-            return
-
-        if len(text) > 1:  # write more than 1 char? write chars 1 by 1
-            for i in range(len(text)):
-                self.write(text[i], (pos[0] + i, pos[1]), color, offset, -1, length)
-            return
+            x += length
+        else:
+            assert align == -1  # left
 
         # color string name
-        if color is not None:
-            color = pg_color(color)
+        r, g, b = quantize_color(pg_color(color))
+        rgb = r << 16 | g << 8 | b
+        offset = (offset[0], offset[1])
+
+        for i, line in enumerate(lines):
+            if len(line) == 1:
+                self.write_char(line, x, y + i, rgb, offset)
+            elif line:
+                self.write_line(line, x, y + i, rgb, offset)
+
+    def write_char(self, text, x, y, rgb, offset):
+        h, w = self.chars.shape
+        if not (-w <= x < w and -h <= y < h):
+            return  # outside of screen
+
+        code = ord(text)
+        if (
+            self.chars[y, x] == code
+            and self.colors[y, x] == rgb
+            and self.offsets[y, x, 0] == offset[0]
+            and self.offsets[y, x, 1] == offset[1]
+        ):
+            return  # already there
+
+        self.chars[y, x] = code
+        self.colors[y, x] = rgb
+        self.offsets[y, x] = offset
+        self.dirty = True
 
-        # note that this allows negative positioning
-        try:
-            self.chars[pos[1]][pos[0]]
-        except IndexError:
-            # outside of screen
-            # print(pos)
-            return
+    def write_line(self, text, x, y, rgb, offset):
+        h, w = self.chars.shape
+        if not -h <= y < h:
+            return  # outside of screen
 
-        self.chars[pos[1]][pos[0]] = Char(
-            text,
-            [
-                self.font.render(text, True, color),
-                self.font.render(text, True, self.shadow_color),
-                self.font.render(text, True, self.shadow2_color),
-            ],
-            ivec2(*pos),
-            color,
-            ivec2(*offset),
-        )
-        self.dirty_line[pos[1]] = True
+        codes = np.frombuffer(text.encode("utf-32-le"), np.int32)
+        if 0 <= x and x + len(text) <= w:
+            cells = slice(x, x + len(text))  # cheaper than an index array
+        else:
+            cells = np.arange(x, x + len(text))
+            inside = (-w <= cells) & (cells < w)
+            cells, codes = cells[inside], codes[inside]
+
+        chars, colors, offsets = self.chars[y], self.colors[y], self.offsets[y]
+        if (
+            np.array_equal(chars[cells], codes)
+            and (colors[cells] == rgb).all()
+            and (offsets[cells] == offset).all()
+        ):
+            return  # already there
+
+        chars[cells] = codes
+        colors[cells] = rgb
+        offsets[cells] = offset
         self.dirty = True
 
     def write_center(
@@ -204,94 +199,141 @@ class Terminal(Entity):
 
         :param char_offset: Shift the text by this offset after centering
         """
-        if isinstance(pos, (int, float)):
-            # if pos is int, set col number
-            pos = ivec2(0, pos)
-        else:
-            pos = ivec2(pos[0], pos[1])
-
-        # print(pos)
-        pos.x -= self.size.x / 2
-        pos += char_offset
-        return self.write(text, pos, color, offset, 0, length)
+        x, y = self.cell(pos)
+        x = int(x - self.size.x / 2) + char_offset[0]
+        y += char_offset[1]
+        return self.write(text, (x, y), color, offset, 0, length)
 
     def write_right(self, text, pos=0, color=vec4(1, 1, 1, 0), offset=(0, 0), length=0):
         """
         write() to screen right side
         """
-
-        if isinstance(pos, (int, float)):
-            # if pos is int, set row number
-            pos = ivec2(0, pos)
-        else:
-            pos = ivec2(pos[0], pos[1])
-
-        pos.x += self.size.x - 2
-        return self.write(text, pos, color, offset, 1, len(text))
+        x, y = self.cell(pos)
+        x += self.size.x - 2
+        return self.write(text, (x, y), color, offset, 1, len(text))
 
     def scramble(self):
         """
         Randomly sets every character in terminal to random character and color
         """
 
-        for y in range(self.size.y):
-            for x in range(self.size.x):
-                col = (
-                    random.randint(0, 255),
-                    random.randint(0, 255),
-                    random.randint(0, 255),
+        # a few random colors, so the glyphs are reused from the atlas
+        colors = np.array(
+            [
+                r << 16 | g << 8 | b
+                for r, g, b in (
+                    quantize_color(np.random.randint(0, 256, 3)) for i in range(8)
                 )
-                self.write(chr(random.randint(32, 126)), (x, y), col)
+            ],
+            np.int32,
+        )
+
+        shape = self.chars.shape
+        self.chars[:] = np.random.randint(32, 127, shape)
+        self.colors[:] = colors[np.random.randint(0, 8, shape)]
+        self.offsets[:] = 0
+        self.dirty = True
 
     def update(self, dt):
 
         pass
 
-    def render(self, camera):
-
-        if self.dirty:
+    def positions(self, ys, xs, offsets):
+        """Where the text of the cells (ys, xs) is drawn on the surface"""
+        pos = np.stack((xs, ys), 1) * tuple(self.font_size) + offsets
+        pos += tuple(self._offset + self.spacing / 2)
+        return np.clip(pos, 0, tuple(self.app.size))
 
-            # self.surface.fill((255,255,255,0), (0, 0, *self.app.size))
+    def redraw(self):
+        """
+        Redraw the cells that changed since the last redraw, with whatever
+        overlaps them (shadows go over the neighbors)
+        """
+        cells = (self.chars, self.colors, self.offsets)
+        drawn = self.drawn
+        self.drawn = tuple(a.copy() for a in cells)
+
+        rects = None
+        if drawn is not None:
+            changed = (drawn[0] != self.chars) | (drawn[1] != self.colors)
+            changed |= (drawn[2] != self.offsets).any(axis=2)
+            # only the non blank cells draw something
+            changed &= (drawn[0] > 32) | (self.chars > 32)
+            ys, xs = np.nonzero(changed)
+            if not len(ys):
+                return False
+            if len(ys) <= MAX_DIRTY_CELLS:
+                rects = self.cell_rects(ys, xs, drawn[2][ys, xs])
+                rects += self.cell_rects(ys, xs, self.offsets[ys, xs])
+                rects = merge_rects(rects)
+
+        ys, xs = np.nonzero(self.chars)
+        pos = self.positions(ys, xs, self.offsets[ys, xs])
+        w, h = self.font_size
+
+        if rects is None:
+            self.surface.fill(self.bg_color)
+            self.draw(ys, xs, pos)
+            return True
+
+        for rect in rects:
+            self.surface.fill(self.bg_color, rect)
+            self.surface.set_clip(rect)
+            px, py = pos[:, 0], pos[:, 1]
+            hit = (px - MARGIN < rect.right) & (px + w + MARGIN > rect.x)
+            hit &= (py - MARGIN < rect.bottom) & (py + h + MARGIN > rect.y)
+            self.draw(ys[hit], xs[hit], pos[hit])
+        self.surface.set_clip(None)
+        return True
+
+    def cell_rects(self, ys, xs, offsets):
+        """Rects covered by the cells, shadows included"""
+        w, h = self.font_size
+        return [
+            pygame.Rect(x - MARGIN, y - MARGIN, w + 2 * MARGIN, h + 2 * MARGIN)
+            for x, y in self.positions(ys, xs, offsets).tolist()
+        ]
+
+    def draw(self, ys, xs, pos):
+        """Draw the cells, in order (row by row)"""
+        glyphs = self.glyphs
+        shadow, shadow2 = self.shadow_color, self.shadow2_color
+        chars, colors = self.chars[ys, xs].tolist(), self.colors[ys, xs].tolist()
+        for ch, rgb, (x, y) in zip(chars, colors, pos.tolist()):
+            if ch <= 32:
+                continue  # space
+            text = chr(ch)
+            color = (rgb >> 16, rgb >> 8 & 255, rgb & 255)
+            self.surface.blit(glyphs.get(text, shadow), (x + 2, y - 2))
+            self.surface.blit(glyphs.get(text, shadow2), (x - 3, y + 3))
+            # text
+            self.surface.blit(glyphs.get(text, color), (x, y))
 
-            for y in range(len(self.chars)):
+    def render(self, camera):
 
-                if not self.dirty_line[y]:
-                    continue
+        changed = self.dirty and self.redraw()
+        self.dirty = False
 
-                # clear line
-                self.surface.fill(
-                    self.bg_color,
-                    (
-                        0,
-                        y * self.font_size.y - 3,
-                        self.app.size.x + 6,
-                        self.font_size.y + 6,
-                    ),
+        if self.app.screen is self.app.display:
+            self.app.screen.blit(self.surface, (0, 0))  # screen space
+        elif NATIVE_HUD:
+            self.app.hud.append(self.surface)  # over the upscaled world
+        else:
+            if changed or not self.scaled:
+                self.scaled = pygame.transform.smoothscale(
+                    self.surface, self.app.render_size
                 )
-
-            for y in range(len(self.chars)):
-
-                if not self.dirty_line[y]:
-                    continue
-
-                for x in range(len(self.chars[y])):
-                    ch = self.chars[y][x]
-                    if ch:
-                        ofs = self._offset + ch.offset + self.spacing / 2
-                        pos = ivec2(x, y) * self.font_size + ofs
-                        pos.x = max(0, min(self.app.size.x, pos.x))
-                        pos.y = max(0, min(self.app.size.y, pos.y))
-                        self.surface.blit(
-                            ch.imgs[1], pos + ivec2(2, -2),
-                        )
-                        self.surface.blit(
-                            ch.imgs[2], pos + ivec2(-3, 3),
-                        )
-                        # text
-                        self.surface.blit(ch.imgs[0], pos)
-                    self.dirty_line[y] = False
-
-            self.dirty = False
-
-        self.app.screen.blit(self.surface, (0, 0))  # screen space
+            self.app.screen.blit(self.scaled, (0, 0))
         # self.app.screen.blit(self.surface, -ivec2(*camera.position.xy))
+
+
+def merge_rects(rects):
+    """Union the overlapping rects, so no pixel is redrawn twice"""
+    merged = []
+    for rect in rects:
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
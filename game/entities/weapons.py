@@ -1,6 +1,7 @@
 import pygame
-from glm import vec3, normalize, length, dot
+from glm import vec3, normalize, length
 
+from game.base.being import Being
 from game.base.enemy import Enemy
 from game.base.entity import Entity
 from game.constants import BULLET_OFFSET, BULLET_IMAGE_PATH, BULLET_SPEED, LASER_SPEED
@@ -9,6 +10,7 @@ from game.util import debug_log_call, clamp
 
 
 class Weapon(Entity):
+    renderable = False
     speed = 4
     max_ammo = 20
     damage = 1
@@ -111,12 +113,36 @@ class MachineGun(Weapon):
 
 
 class Laser(Bullet):
+    batched = False  # draws a line
+
     def __init__(self, app, scene, parent, position, direction, length, color, damage):
         super().__init__(
             app, scene, parent, position, direction, damage, speed=LASER_SPEED
         )
         self.color = pygame.Color(color)
+        self.size = vec3(self.size)  # keep the sprite size for the raycast
         self.size.z = length
+        self.solid = False  # see update()
+
+    def update(self, dt):
+        # the beam is tested with a raycast instead of the collision system
+        direction = normalize(self.velocity)
+        reach = length(self.velocity) * dt + self.size.z
+        friendly = self.parent.friendly
+        hits = self.scene.raycast(
+            self.position,
+            direction,
+            reach,
+            Being,
+            radius=self.size.x / 2,
+            filter=lambda e: e.solid and e.friendly != friendly,
+        )
+        if hits:
+            self.collision(hits[0][1], dt)
+            if self.removed:
+                return
+
+        super().update(dt)
 
     def render(self, camera):
         p1 = camera.world_to_screen(self.position)
@@ -175,25 +201,17 @@ class TracingBullet(Bullet):
         self.t = 0
 
     def find_aim(self):
-        # Find closest enemy
-        dist = float("inf")
-        closest = None
-        for e in self.scene.iter_entities(Enemy):
-            if not e.alive or e.position.z > self.position.z:
-                continue
-
-            dir = e.position - self.position
-            v = vec3(self.velocity.xy * 10, self.velocity.z)
-            d = vec3(dir.xy * 10, dir.z)
-            if abs(dot(normalize(v), normalize(d))) < 0.9:
-                # Angles are too different
-                continue
-
-            d = length(e.position - self.position)
-            if 200 < d < dist:
-                dist = d
-                closest = e
-        return closest
+        # Find closest enemy ahead, roughly in the direction we're going
+        # (xy is weighted more than z when comparing directions)
+        z = self.position.z
+        return self.scene.nearest(
+            self.position,
+            Enemy,
+            cone=(self.velocity, 0.9),
+            scale=(10, 10, 1),
+            min_dist=200,
+            filter=lambda e: e.alive and e.position.z <= z,
+        )
 
     def update(self, dt):
         if self.aim is None:
@@ -1,10 +1,16 @@
 #!/usr/bin/env python
 
-import functools
+from contextlib import contextmanager
 
 import glm
+import numpy as np
 import pygame
 
+from game.base import collision
+from game.base.depth import depth_sort
+from game.base.gradient import Gradient
+from game.base.overlay import Overlay
+from game.base.spatial import SpatialIndex
 from game.base.signal import Signal, Slot, SlotList
 from game.base.when import When
 from os import path
@@ -33,8 +39,15 @@ import math
 import weakref
 import random
 
-# key function to do depth sort
-z_compare = functools.cmp_to_key(lambda a, b: a.get().position.z - b.get().position.z)
+
+def sprite_size(e):
+    """
+    Size of the sprite of an entity: as last rendered, else its surface,
+    (0, 0) if it's unknown until it renders (animations)
+    """
+    if e.sprite_size != (0, 0) or not e._surface:
+        return e.sprite_size
+    return e._surface.get_size()
 
 
 class Scene(Signal):
@@ -46,6 +59,7 @@ class Scene(Signal):
         self.when = When()
         self.slotlist = SlotList()
         self._sky_color = None
+        self.sky_gradient = None
         self.ground = None
         self._ground_color = None
         self._script = None
@@ -59,8 +73,29 @@ class Scene(Signal):
         self.rain_slot = None
         self.has_clouds = False
         self.lowest_fps = 1000
+        self.collision_broadphase = COLLISION_BROADPHASE
+        self.collision_stats = collision.new_stats()
+        self.colliders = collision.ColliderTable()
+        self.contacts = collision.Contacts()
+        self.depth_moved = 0  # slots moved by the last depth sort
+        self._interpolation = False  # forced on, see interpolation
+        # class -> {entity: None} for every class in the entity's mro,
+        # so looking up a type doesn't scan the whole scene
+        self.types = {}
+        self.spatial = SpatialIndex()
+        self.spatial_dirty = True  # rebuilt on the first query of the frame
+        # see on_collision_connect() and friends
+        self.collision_signals = {
+            "stay": Signal(),
+            "enter": Signal(),
+            "leave": Signal(),
+        }
 
         self.on_render = Signal()
+        # static layers over the scene
+        self.overlay = Overlay(self.app.size, self.app.render_scale)
+        self.render_queue = []  # (surface, position) blits, see flush()
+        self.cull_stats = {"visible": 0, "culled": 0}
 
         # self.script_paused = False
         # self.script_slots = []
@@ -71,9 +106,6 @@ class Scene(Signal):
         #     (randint(0, 200), randint(0, 200)) for i in range(star_density)
         # ]
 
-        # color change delays when using opt funcs
-        self.delay_t = 0
-        self.delay = 0.5
         self.time = 0
 
         self.sky_color = None
@@ -104,12 +136,61 @@ class Scene(Signal):
 
         self.when.every(1, self.stabilize, weak=False)
 
-    def iter_entities(self, *types):
+    def entities(self):
+        """Iterate over the live entities (skips the dead slots)"""
         for slot in self.slots:
-            ent = slot.get()
-            if ent and isinstance(ent, types):
+            if not slot.dead:
+                yield slot.get()
+
+    def iter_entities(self, *types):
+        """Iterate over the live entities of any of the given types"""
+        if len(types) == 1:
+            ents = list(self.types.get(types[0], ()))
+        else:
+            ents = {}
+            for t in types:
+                ents.update(self.types.get(t, {}))
+        for ent in ents:
+            if not ent.removed:
                 yield ent
 
+    def count(self, *types):
+        """Number of entities of any of the given types, e.g. count(Enemy)"""
+        if len(types) == 1:
+            return len(self.types.get(types[0], ()))
+        return sum(1 for e in self.iter_entities(*types))
+
+    def clear_type(self, Type):
+        for ent in list(self.types.get(Type, ())):
+            self.remove(ent)
+
+    def spatial_index(self):
+        """The spatial index, rebuilt if entities moved since the last query"""
+        if self.spatial_dirty:
+            self.spatial.rebuild(self.entities())
+            self.spatial_dirty = False
+        return self.spatial
+
+    def nearest(self, pos, types=None, cone=None, **kwargs):
+        """
+        Closest entity of `types` to `pos`, see SpatialIndex.nearest()
+        :param cone: (direction, cos)
+        """
+        return self.spatial_index().nearest(pos, types, cone, **kwargs)
+
+    def raycast(self, origin, direction, max_dist, types=None, **kwargs):
+        """
+        (distance, entity) pairs hit by a ray, closest first.
+        See SpatialIndex.raycast()
+        """
+        return self.spatial_index().raycast(
+            origin, direction, max_dist, types, **kwargs
+        )
+
+    def within(self, pos, radius, types=None, **kwargs):
+        """Entities less than `radius` away from `pos`, closest first"""
+        return self.spatial_index().within(pos, radius, types, **kwargs)
+
     def cloudy(self):
         if self.has_clouds:
             return
@@ -204,41 +285,31 @@ class Scene(Signal):
             self.add(Star(self.app, self, pos, velz))
 
     def draw_sky(self):
-        width, height = self.app.size / 8
+        """
+        Color the sky gradient, it's drawn once and only its palette changes
+        (see Gradient)
+        """
+        if not self.sky_gradient:
+            size = self.app.render_size
+            self.sky_gradient = Gradient(size / 8, size)
+        gradient = self.sky_gradient
+        self.sky = gradient.surface
 
-        self.sky = pygame.Surface((width, height))
         sky_color = self.sky_color or ncolor(pygame.Color("blue"))
         sky_color = [255 * s for s in sky_color]
 
-        # for y in range(height):
-        #     interp = (1 - y / height) * 2
-        #     for x in range(width):
-        #         rand = rand_RGB()
-        #         color = rgb_mix(sky_color, rand, 0.02)
-        #           c = (sk * 0.98 + rand * 0.02) / i**1.1
-
-        #         if interp == 0:
-        #             color = (255, 255, 255)
-        #         else:
-        #             color = [min(int(c / interp ** 1.1), 255) for c in color]
-        #         self.sky.set_at((x, y), color)
-
-        # Draw gradient
-        for y in range(height):
-            interp = (1 - y / height) * 2
-            base = [min(int(c / interp ** 1.1), 255) for c in sky_color]
-            pygame.draw.line(self.sky, base, (0, y), (width, y))
-
-        noise = noise_surf_dense_bottom(self.sky.get_size(), random.randrange(5))
-        self.sky.blit(
-            noise, (0, 0), None,
-        )
-        self.sky = pygame.transform.scale(self.sky, self.app.size)
+        # Gradient
+        colors = []
+        for y in gradient.rows:
+            interp = (1 - y) * 2
+            colors.append([min(int(c / interp ** 1.1), 255) for c in sky_color[:3]])
 
-        # if self.stars_visible:
-        #     self.draw_stars(self.sky, self.star_pos)
+        # Noise, denser at the bottom (see noise_surf_dense_bottom)
+        interp = 1 - gradient.rows
+        alpha = np.minimum(0.02 / interp * 255, 255).astype(int) / 255
+        noise = (10 + gradient.noise * 245) / interp[:, None, None] / 6
 
-        self.sky = pygame.transform.scale(self.sky, self.app.size)
+        gradient.recolor(colors, noise, alpha)
 
     # def draw_stars(self, surface, star_positions):
     #     size = 1
@@ -290,6 +361,19 @@ class Scene(Signal):
         self.when.once(sound.get_length(), lambda: self.remove_sound(sound), weak=False)
         return sound, channel, slot
 
+    @property
+    def interpolation(self):
+        """
+        With fixed timesteps (app.fixed_timestep, what App.run() steps by),
+        keep the positions before each update so rendering can interpolate
+        (see interpolated()). Can be forced on.
+        """
+        return self._interpolation or bool(self.app.fixed_timestep)
+
+    @interpolation.setter
+    def interpolation(self, value):
+        self._interpolation = value
+
     @property
     def script(self):
         return self._script
@@ -330,30 +414,53 @@ class Scene(Signal):
             pygame.mixer.music.load(path.join(MUSIC_DIR, filename))
             pygame.mixer.music.play(-1)
 
-    def on_collision_connect(self, A, B, func, once=True):
+    def on_collision_connect(self, A, B, func, once=False, weak=True):
         """
         during collision (touching)
+
+        A and B can be entities, entity types or None (anything).
+        func(a, b) is called with a matching A and b matching B.
+        Only pairs whose collision layers interact are reported.
         """
-        pass
+        return self.connect_collision("stay", A, B, func, once, weak)
 
-    def on_collision_once(self, A, B, func, once=True):
+    def on_collision_once(self, A, B, func, once=True, weak=True):
         """
         trigger only once
         """
-        pass
+        return self.connect_collision("enter", A, B, func, True, weak)
 
-    def on_collision_enter(self, A, B, func, once=True):
+    def on_collision_enter(self, A, B, func, once=False, weak=True):
         """
         trigger upon enter collision
         """
+        return self.connect_collision("enter", A, B, func, once, weak)
 
-        pass
-
-    def on_collision_leave(self, A, B, func, once=True):
+    def on_collision_leave(self, A, B, func, once=False, weak=True):
         """
         trigger upon leave collision
         """
-        pass
+        return self.connect_collision("leave", A, B, func, once, weak)
+
+    def connect_collision(self, event, A, B, func, once, weak):
+        def match(e, what):
+            if what is None:
+                return True
+            if isinstance(what, type):
+                return isinstance(e, what)
+            return e is what
+
+        def handler(a, b):
+            if not (match(a, A) and match(b, B)):
+                if not (match(b, A) and match(a, B)):
+                    return
+                a, b = b, a
+            if once:
+                slot.disconnect()
+            func(a, b)
+
+        slot = self.collision_signals[event].connect(handler, weak)
+        return slot
 
     # @property
     # def script(self):
@@ -380,6 +487,8 @@ class Scene(Signal):
     def add(self, entity):
         slot = self.connect(entity, weak=False)
         entity.slot = weakref.ref(slot)
+        for cls in type(entity).__mro__:
+            self.types.setdefault(cls, {})[entity] = None
         # self.slotlist += slot
         return entity
 
@@ -400,14 +509,8 @@ class Scene(Signal):
 
     def set_sky_color_opt(self, c):
         """
-        Optimized for fades.
+        For fades: only sets the sky if there's a color
         """
-        if self.delay_t > EPSILON:
-            return False
-        # print("delay")
-
-        self.delay_t = self.delay
-
         self._sky_color = ncolor(c) if c else None
         if self._sky_color:
             self.draw_sky()
@@ -420,7 +523,7 @@ class Scene(Signal):
 
     def set_ground_color_opt(self, c):
         """
-        Optimized for fades.
+        For fades: sets the ground without touching the rocks
         """
         if not self.ground:
             self.ground = self.add(Ground(self.app, self, GROUND_HEIGHT))
@@ -431,14 +534,57 @@ class Scene(Signal):
 
     def remove(self, entity):
         # self.slotlist -= entity
-        super().disconnect(entity)
+        slot = entity.slot() if entity.slot else None
+        if slot:
+            return self.disconnect(slot)
+        return super().disconnect(entity)
+
+    def disconnect(self, slot):
+        """
+        Entity slots are only marked dead here, which is O(1) and safe while
+        iterating.  Dead slots are skipped by each() and dropped by the depth
+        sort once per frame.
+        """
+        if isinstance(slot, Slot) and slot.sig() is self:
+            if not slot.dead:
+                slot.dead = True
+                entity = slot.get()
+                for cls in type(entity).__mro__:
+                    ents = self.types.get(cls)
+                    if ents:
+                        ents.pop(entity, None)
+            return True
+        return super().disconnect(slot)
+
+    def each(self, func, *args):
+        """Call func(entity, *args) on each live entity"""
+        if self.blocked:
+            self.queued.append(lambda func=func, args=args: self.each(func, *args))
+            return None
+
+        self.blocked += 1
+        for slot in self.slots:
+            if not slot.dead:
+                func(slot.get(), *args)
+        self.blocked -= 1
+
+        self.clean()
 
     # def resume(self):
     #     self.script_paused = False
 
     def invalid_size(self, size):
         """Checks component for 0 or NaNs"""
-        return any(c != c or abs(c) < EPSILON for c in size)
+        return collision.invalid_size(size)
+
+    def collide(self, a, b, dt, entered):
+        """Run the collision callbacks of a for touching b"""
+        if not collision.wants(a, b):
+            return
+        if entered and hasattr(a, "collision_enter"):
+            a.collision_enter(b, dt)
+        if hasattr(a, "collision"):
+            a.collision(b, dt)
 
     def update_collisions(self, dt):
 
@@ -446,45 +592,32 @@ class Scene(Signal):
 
         self.blocked += 1
 
-        for slot in self.slots:
-            a = slot.get()
-            # only check if a is solid
-            if not a or not a.solid:
-                continue
-
-            if self.invalid_size(a.collision_size):
-                continue
-
-            # for each slot, loop through each slot
-            for slot2 in self.slots:
-                b = slot2.get()
-                # only check if b is solid
-                if not b or not b.solid:
-                    continue
-                if slot is not slot2:
-                    if not a.has_collision and not b.has_collision:
-                        continue
-
-                    if self.invalid_size(b.collision_size):
-                        continue
-
-                    a_min = a.position - a.collision_size / 2
-                    a_max = a.position + a.collision_size / 2
-                    b_min = b.position - b.collision_size / 2
-                    b_max = b.position + b.collision_size / 2
-                    col = not (
-                        b_min.x > a_max.x
-                        or b_max.x < a_min.x
-                        or b_min.y > a_max.y
-                        or b_max.y < a_min.y
-                        or b_min.z > a_max.z
-                        or b_max.z < a_min.z
-                    )
-                    if col:
-                        if a.has_collision:
-                            a.collision(b, dt)
-                        if b.has_collision:
-                            b.collision(a, dt)
+        self.collision_stats = collision.new_stats()
+        signals = self.collision_signals
+        self.contacts.begin()
+        if self.collision_broadphase == "batch":
+            broadphase = self.colliders  # keeps its buffers between frames
+        else:
+            broadphase = collision.BROADPHASES[self.collision_broadphase]
+        pairs = broadphase(self.entities(), self.collision_stats)
+        for a, b in pairs:
+            new, entered = self.contacts.touch(a, b)
+            self.collide(a, b, dt, entered)
+            self.collide(b, a, dt, entered)
+            if new:
+                if entered and signals["enter"]:
+                    signals["enter"](a, b)
+                if signals["stay"]:
+                    signals["stay"](a, b)
+
+        for a, b in self.contacts.end():
+            if collision.wants(a, b) and hasattr(a, "collision_leave"):
+                a.collision_leave(b)
+            if collision.wants(b, a) and hasattr(b, "collision_leave"):
+                b.collision_leave(a)
+            if signals["leave"]:
+                signals["leave"](a, b)
+
         self.blocked -= 1
 
         # run pending slot queue
@@ -521,7 +654,6 @@ class Scene(Signal):
 
         self.time += dt
         # print(self.time)
-        self.delay_t = max(0, self.delay_t - dt)
 
         # do time-based events
         self.when.update(dt)
@@ -538,10 +670,12 @@ class Scene(Signal):
             self.scripts.each(lambda x, dt: x.update(dt), dt)
             self.scripts.slots = list(filter(self.filter_script, self.scripts.slots))
 
-        # self.sort(lambda a, b: a.z < b.z)
-        # self.slots = sorted(self.slots, key=z_compare)
-        self.slots.sort(key=z_compare)
-        self.slots = list(filter(lambda x: not x.get().removed, self.slots))
+        # keep the slots depth sorted, only moving the ones out of order
+        self.slots, self.depth_moved = depth_sort(self.slots)
+
+        if self.interpolation:
+            for e in self.entities():
+                e.last_position = vec3(e._position)
 
         # call update(dt) on each entity
         self.each(lambda x, dt: x.update(dt), dt)
@@ -551,20 +685,100 @@ class Scene(Signal):
         particle_count = 0
         for i, slot in enumerate(reversed(self.slots)):
             e = slot.get()
-            if e.particle:
+            if e.particle and not slot.dead:
                 particle_count += 1
                 if particle_count >= self.max_particles:
                     slot.disconnect()
         self.blocked -= 1
         self.clean()
 
+        self.spatial_dirty = True
+
+    @contextmanager
+    def interpolated(self, alpha):
+        """
+        Temporarily move the entities `alpha` of the way between their
+        position before the last update and their current one.
+        Used to render between two fixed timesteps.
+        """
+        if alpha is None or not self.interpolation:
+            yield
+            return
+
+        moved = []
+        for e in self.entities():
+            pos = e._position
+            if e.last_position != pos:
+                e._position = glm.mix(e.last_position, pos, alpha)
+                moved.append((e, pos))
+        try:
+            yield
+        finally:
+            for e, pos in moved:
+                e._position = pos
+
+    def flush(self):
+        """Draw the queued sprites, all in one call"""
+        if self.render_queue:
+            self.app.screen.blits(self.render_queue, False)
+            self.render_queue = []
+
+    def project(self, camera):
+        """
+        Project every sprite on the screen at once (see Camera.project_many),
+        Entity.render() then picks up its rect from entity.projection.
+        :return: (entities, positions, rects, visible) numpy arrays aligned
+            with the renderable entities
+        """
+        ents = [e for e in self.entities() if e.renderable]
+        positions = np.array([tuple(e.position) for e in ents]).reshape(-1, 3)
+        half_sizes = np.array([sprite_size(e) for e in ents]).reshape(-1, 2) / 2
+        rects, visible = camera.project_many(positions, half_sizes)
+        for e, rect in zip(ents, rects.tolist()):
+            e.projection = rect
+        return ents, positions, rects, visible
+
+    def cull(self, camera):
+        """
+        Culling stage before render: mark the sprites that are off the screen
+        or past the fog (entity.culled) so render() skips them.
+        Sprites behind the camera are left alone, rendering removes them.
+        """
+        ents, positions, rects, visible = self.project(camera)
+        culled = 0
+        if ents:
+            direction = np.array(tuple(camera.direction))
+            with np.errstate(invalid="ignore"):
+                dist = (positions - tuple(camera.position)) @ direction
+            fogged = dist >= camera.screen_dist * FULL_FOG_DISTANCE
+            behind = np.isnan(rects[:, 0])
+            unsized = rects[:, 2] == 0  # not rendered yet, size unknown
+            flags = np.array([(e.batched and e.cullable, e.fog) for e in ents])
+            shown = visible & ~(fogged & flags[:, 1])
+            cull = flags[:, 0] & ~behind & ~unsized & ~shown
+            for e, c in zip(ents, cull.tolist()):
+                e.culled = c
+            culled = int(np.count_nonzero(cull))
+        self.cull_stats = {"visible": len(ents) - culled, "culled": culled}
+
     def render(self, camera):
         # call render(camera) on all scene entities
 
         if self.sky_color is not None:
             self.app.screen.blit(self.sky, (0, 0))
 
+        self.cull(camera)
+
         # call render on each entity
-        self.each(lambda x: x.render(camera))
+        def render(e):
+            if not e.renderable or e.culled:
+                return
+            if not e.batched:
+                self.flush()  # keep the depth order
+            e.render(camera)
+
+        self.each(render)
+        self.flush()
 
+        self.overlay.render(self.app.screen)
         self.on_render(camera)
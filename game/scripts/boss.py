@@ -28,11 +28,7 @@ class Level5(Level):
 
         self.spawn(0, 0, None, Boss)
 
-        while True:
-            for slot in self.scene.slots:
-                e = slot.get()
-                if isinstance(e, Boss):
-                    continue
+        while self.scene.count(Boss):
             yield self.script.sleep(0.5)
 
         yield self.huge_pause()
@@ -72,14 +72,13 @@ class Game(State):
         for i in range(rows):
             h = int(backdrop_h) // rows
             y = h * i
-            backdrop = pygame.Surface((self.app.size.x, h))
             interp = i / rows
             interp_inv = 1 - i / rows
-            backdrop.set_alpha(255 * interp * 0.4)
-            # backdrop.fill((0))
-            backdrop.fill(pg_color(ncolor("white") * interp_inv))
-            self.scene.on_render += lambda _, y=y, backdrop=backdrop: self.app.screen.blit(
-                backdrop, (0, y)
+            self.scene.overlay.strip(
+                (0, y),
+                (self.app.size.x, h),
+                pg_color(ncolor("white") * interp_inv),
+                255 * interp * 0.4,
             )
 
         # backdrop = pygame.Surface((self.app.size.x, h))
@@ -190,19 +189,44 @@ class Game(State):
 
         # self.debug = True
         if self.debug:
+            spr = self.app.sprites
+            self.terminal.write(
+                f"Spr: {len(spr)} {spr.hit_rate():.0%} hit {spr.bytes >> 20}M   ", 11
+            )
+            fonts = self.app.fonts
+            self.terminal.write(
+                f"Fonts: {len(fonts)} loads {fonts.loads} {fonts.bytes >> 10}K   ", 12
+            )
+            col = self.scene.collision_stats
+            self.terminal.write(
+                f"Col: {col['tested']} tested {col['pruned']} pruned     ", 13
+            )
             self.terminal.write(
                 "Sc/when:  " + str(len(self.scene.script.when)) + "     ", 14
             )
             self.terminal.write("S/when:  " + str(len(self.scene.when)) + "     ", 15)
             self.terminal.write("SL:  " + str(len(self.scene.slotlist)) + "     ", 16)
-            self.terminal.write("Res:  " + str(len(self.app.cache)) + "     ", 17)
+            res = self.app.cache
+            self.terminal.write(
+                f"Res: {len(res)} {res.hits}/{res.misses} hit/miss "
+                f"{res.total_bytes() >> 20}M   ",
+                17,
+            )
             self.terminal.write(f"FPS low:  {self.scene.lowest_fps}    ", 18)
             self.terminal.write(f"Pmax:     {self.scene.max_particles}    ", 19)
-            self.terminal.write(f"Entities: {len(self.scene.slots)}   ", 20)
+            cull = self.scene.cull_stats
+            self.terminal.write(
+                f"Entities: {len(self.scene.slots)} "
+                f"vis {cull['visible']} cull {cull['culled']}   ",
+                20,
+            )
             self.terminal.write(f"FPS:      {self.app.fps}    ", 21)
 
-        self.scene.render(self.camera)
-        self.gui.render(self.camera)
+        # between two fixed timesteps, draw where things are in between
+        alpha = None if self.paused else self.app.alpha
+        with self.scene.interpolated(alpha):
+            self.scene.render(self.camera)
+            self.gui.render(self.camera)
 
         assert self.scene.blocked == 0
 
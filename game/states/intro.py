@@ -31,13 +31,13 @@ class Intro(State):
         for i in range(rows):
             h = int(backdrop_h) // rows
             y = h * i
-            backdrop = pygame.Surface((self.app.size.x, h))
             interp = i / rows
             interp_inv = 1 - i / rows
-            backdrop.set_alpha(255 * interp_inv * 0.2)
-            backdrop.fill(pg_color(ncolor("white") * interp_inv))
-            self.scene.on_render += lambda _, y=y, backdrop=backdrop: self.app.screen.blit(
-                backdrop, (0, y)
+            self.scene.overlay.strip(
+                (0, y),
+                (self.app.size.x, h),
+                pg_color(ncolor("white") * interp_inv),
+                255 * interp_inv * 0.2,
             )
 
         rows = 8
@@ -45,13 +45,13 @@ class Intro(State):
         for i in range(rows):
             h = int(backdrop_h) // rows
             y = h * i
-            backdrop = pygame.Surface((self.app.size.x, h))
             interp = i / rows
             interp_inv = 1 - i / rows
-            backdrop.set_alpha(255 * interp_inv * 0.1)
-            backdrop.fill(pg_color(ncolor("white") * interp_inv))
-            self.scene.on_render += lambda _, y=y, backdrop=backdrop: self.app.screen.blit(
-                backdrop, (0, y)
+            self.scene.overlay.strip(
+                (0, y),
+                (self.app.size.x, h),
+                pg_color(ncolor("white") * interp_inv),
+                255 * interp_inv * 0.1,
             )
 
         backdrop_h = int(24)
@@ -59,14 +59,11 @@ class Intro(State):
         for i in range(rows, 0, -1):
             h = int(backdrop_h) // rows
             y = h * i
-            backdrop = pygame.Surface((self.app.size.x, h))
             interp = i / rows
             interp_inv = 1 - i / rows
-            backdrop.set_alpha(200 * interp_inv)
-            backdrop.fill((0))
-            # backdrop.fill(pg_color(ncolor('black')*interp_inv))
-            self.scene.on_render += lambda _, y=y, backdrop=backdrop: self.app.screen.blit(
-                backdrop, (0, self.app.size.y - y)
+            # pg_color(ncolor('black')*interp_inv)
+            self.scene.overlay.strip(
+                (0, self.app.size.y - y), (self.app.size.x, h), 0, 200 * interp_inv
             )
 
     def pend(self):
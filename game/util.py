@@ -138,6 +138,33 @@ def line_segment_intersection(a, b, p, u) -> Optional[vec2]:
     return None
 
 
+def segment_aabb(p0, p1, box_min, box_max) -> Optional[float]:
+    """
+    Intersect the segment p0 -> p1 with an axis aligned box (slab method).
+
+    :return: fraction t in [0, 1] of the segment where it enters the box
+        (0 if p0 is already inside), None if they don't intersect
+    """
+
+    t0, t1 = 0.0, 1.0
+    d = p1 - p0
+    for i in range(3):
+        if abs(d[i]) < EPSILON:
+            # parallel to this slab
+            if p0[i] < box_min[i] or p0[i] > box_max[i]:
+                return None
+            continue
+        near = (box_min[i] - p0[i]) / d[i]
+        far = (box_max[i] - p0[i]) / d[i]
+        if near > far:
+            near, far = far, near
+        t0 = max(t0, near)
+        t1 = min(t1, far)
+        if t0 > t1:
+            return None
+    return t0
+
+
 def estimate_3d_size(size_2d):
     """
     Return a 3D size given a sprite size.
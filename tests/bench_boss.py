@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Boss render benchmark: frame time of drawing the Level7 boss (a 1024x1024
+8 bit sprite), compared with scaling the whole source every frame (the
+old Entity.render):
+
+- approach: the boss comes from the fog to right in front of the camera.
+  It is always bigger than the screen there, so only the visible part is
+  scaled (SpriteCache.clipped(), not cached).
+- downscale: the same source drawn at 32-200 px, back and forth, through
+  SpriteCache.get() (mip chain, then cached sizes and fog levels).
+
+Run with: python bench_boss.py
+"""
+import sys
+
+sys.path.append("..")
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import time
+import pygame
+from os import path
+from game.base.sprites import SpriteCache
+from game.constants import SPRITES_DIR, SCREEN_DIST, FULL_FOG_DISTANCE
+from game.util import surf_fader, clamp
+
+FRAMES = 600
+SCREEN = (960, 540)
+
+
+def boss_image():
+    # same as Boss.get_animation
+    image = pygame.image.load(path.join(SPRITES_DIR, "buttabomber.gif"))
+    image = pygame.transform.scale(image, (1024, 1024))
+    palette = [(1, 0, 1), (0, 0, 0), (255, 128, 0), (255, 255, 0), (255, 215, 0)]
+    image.set_palette(palette)
+    image.set_colorkey((1, 0, 1))
+    return image
+
+
+def approach():
+    """(size, position, alpha) of the boss for each frame"""
+    far = SCREEN_DIST * FULL_FOG_DISTANCE
+    for i in range(FRAMES):
+        dist = far - (far - 400) * i / FRAMES
+        size = int(1024 * SCREEN_DIST / dist)
+        pos = (SCREEN[0] / 2 - size / 2, SCREEN[1] / 2 - size / 2)
+        alpha = clamp(int(surf_fader(far, dist)), 0, 255)
+        yield size, pos, alpha
+
+
+def downscale():
+    """(size, position, alpha) of a far boss, shrinking then growing again"""
+    for i in range(FRAMES):
+        t = abs(i / FRAMES * 4 % 2 - 1)  # 1 -> 0 -> 1, twice
+        size = int(32 + 168 * t)
+        pos = (SCREEN[0] / 2 - size / 2, SCREEN[1] / 2 - size / 2)
+        yield size, pos, int(64 + 191 * t)
+
+
+def old_render(screen, image, size, pos, alpha):
+    surf = pygame.transform.scale(image, (size, size))
+    surf.set_alpha(alpha)
+    surf.set_colorkey(0)
+    screen.blit(surf, pos)
+
+
+def new_render(screen, image, size, pos, alpha, sprites):
+    if size > screen.get_width() or size > screen.get_height():
+        surf, pos = sprites.clipped(image, (size, size), pos, screen.get_rect(), alpha)
+    else:
+        surf = sprites.get(image, (size, size), alpha)
+    if surf is not None:
+        screen.blit(surf, pos)
+
+
+def run(render, frames):
+    screen = pygame.display.set_mode(SCREEN)
+    image = boss_image()
+    t = time.perf_counter()
+    for size, pos, alpha in frames():
+        screen.fill((0, 0, 0))
+        render(screen, image, size, pos, alpha)
+    return (time.perf_counter() - t) / FRAMES
+
+
+if __name__ == "__main__":
+    pygame.display.init()
+    for name, frames, label in [
+        ("approach", approach, "visible part only (clipped)"),
+        ("downscale", downscale, "sprite cache + mips"),
+    ]:
+        old = run(old_render, frames)
+        sprites = SpriteCache(32 * 1024 * 1024)
+        new = run(lambda *args: new_render(*args, sprites), frames)
+        print(f"boss {name}, {FRAMES} frames, ms per frame")
+        print(f"  scale the whole source:      {old * 1000:.3f}")
+        print(f"  {label + ':':28} {new * 1000:.3f}")
+        print(f"  cache: {len(sprites)} surfaces {sprites.hit_rate():.0%} hits")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Render queue benchmark: 500 sprites drawn with one blit() call each
+against queued and drawn with a single Surface.blits() call.
+1x1 sprites show the per call overhead alone, 16x16 alpha sprites
+add the pixel work.
+
+Run with: python bench_render.py
+"""
+import sys
+
+sys.path.append("..")
+
+import random
+import timeit
+import pygame
+from glm import ivec2
+
+N = 500
+FRAMES = 500
+
+
+def run(size, flags):
+    random.seed(0)
+    screen = pygame.Surface((960, 540))
+    frames = [pygame.Surface((size, size), flags) for i in range(4)]
+    for i, f in enumerate(frames):
+        f.fill((60 * i, 255, 0, 200))
+    sprites = [
+        (random.choice(frames), ivec2(random.randint(0, 940), random.randint(0, 520)))
+        for i in range(N)
+    ]
+
+    def each_blit():
+        for surf, pos in sprites:
+            screen.blit(surf, pos)
+
+    def queued():
+        queue = []
+        for surf, pos in sprites:
+            queue.append((surf, pos))
+        screen.blits(queue, False)
+
+    old = timeit.timeit(each_blit, number=FRAMES) / FRAMES
+    new = timeit.timeit(queued, number=FRAMES) / FRAMES
+    print(f"{N} sprites {size}x{size}, ms per frame")
+    print(f"  blit() per sprite: {old * 1000:.3f}")
+    print(f"  queue + blits():   {new * 1000:.3f}")
+
+
+def main():
+    run(1, 0)
+    run(16, pygame.SRCALPHA)
+
+
+if __name__ == "__main__":
+    main()
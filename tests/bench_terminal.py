@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Terminal text benchmark: the old way of writing one character per
+write() call against the bulk text path, for the text of Intro
+(typed letter by letter), Intermission's counters and scramble().
+Also times redrawing the result, and rendering it again unchanged.
+
+Writes are timed per run: the whole typed text, the 200 counter values
+(two writes each), or one scramble.  Renders are timed per frame.
+
+Run with: python bench_terminal.py
+"""
+import sys
+
+sys.path.append("..")
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import random
+import time
+import timeit
+import pygame
+from test_terminal import make_terminal
+
+FRAMES = 200
+TEXT = "The butterflies are organising!"
+
+
+def per_char(term, text, pos, color):
+    """What write() did: one call per character"""
+    x, y = pos
+    for i, ch in enumerate(text):
+        term.write(ch, (x + i, y), color)
+
+
+def typed(term):
+    # slow_type: a letter per frame, one character writes either way
+    for i, letter in enumerate(TEXT):
+        term.write_center(letter, 5, "white", char_offset=(i, 0), length=len(TEXT))
+
+
+def typed_old(term):
+    x = int(-term.size.x / 2 - len(TEXT) / 2)
+    for i, letter in enumerate(TEXT):
+        per_char(term, letter, (x + i, 5), "white")
+
+
+def counters_old(term):
+    for val in range(0, 1000, 5):
+        text = str(val)
+        per_char(term, text, (term.size.x - len(text) - 1, 3), "white")
+        per_char(term, "Damage Done", (1, 3), "white")
+
+
+def counters(term):
+    for val in range(0, 1000, 5):
+        text = str(val)
+        term.write(text, (term.size.x - len(text) - 1, 3), "white")
+        term.write("Damage Done", (1, 3), "white")
+
+
+def scramble_old(term):
+    colors = [tuple(random.randint(0, 255) for c in range(3)) for i in range(8)]
+    for y in range(term.size.y):
+        for x in range(term.size.x):
+            term.write(chr(random.randint(32, 126)), (x, y), random.choice(colors))
+
+
+def scramble(term):
+    term.scramble()
+
+
+def main():
+    term = make_terminal()
+    term.app.screen = term.app.display = pygame.display.get_surface()
+    random.seed(0)
+    for name, old, new in [
+        ("typed text", typed_old, typed),
+        ("counters", counters_old, counters),
+        ("scramble", scramble_old, scramble),
+    ]:
+        for label, fn in (("per char", old), ("bulk", new)):
+            fn(term)  # warm up (first glyphs, numpy)
+            t = 0
+            for i in range(10):
+                term.clear()
+                term.render(None)
+                start = time.perf_counter()
+                fn(term)
+                t += time.perf_counter() - start
+            print(f"{name:12} {label:8}: {t * 100:7.3f} ms/run")  # 10 runs
+        start = time.perf_counter()
+        term.render(None)
+        t = time.perf_counter() - start
+        print(f"{name:12} redraw  : {t * 1000:7.3f} ms/frame")
+        t = timeit.timeit(lambda: term.render(None), number=10) / 10
+        print(f"{name:12} unchanged: {t * 1000:6.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import math
+import random
+import numpy as np
+from glm import vec2, vec3, normalize
+from game.base.signal import Signal
+from game.entities.camera import Camera
+
+
+def test_project_many():
+    random.seed(3)
+    camera = Camera(None, Signal(), vec2(960, 540), position=vec3(10, 20, 300))
+    camera.up = normalize(vec3(0.1, 1, 0))  # tilted
+
+    positions = [
+        vec3(random.uniform(-500, 500), random.uniform(-300, 300), random.uniform(-4000, 0))
+        for i in range(50)
+    ]
+    positions.append(vec3(0, 0, 1000))  # behind
+    half = vec3(-16, 8, 0)
+    rects, visible = camera.project_many(
+        np.array([tuple(p) for p in positions]), np.array([(16, 8)] * len(positions))
+    )
+
+    world_half = camera.rel_to_world(half) - camera.position
+    for p, rect, vis in zip(positions, rects.tolist(), visible.tolist()):
+        tl = camera.world_to_screen(p + world_half)
+        br = camera.world_to_screen(p - world_half)
+        if tl is None:
+            assert math.isnan(rect[0]) and not vis
+            continue
+        assert np.allclose(rect, [tl.x, tl.y, br.x - tl.x, br.y - tl.y], atol=1e-3)
+
+
+def test_basis_cache():
+    camera = Camera(None, Signal(), vec2(960, 540))
+    assert camera.horizontal == vec3(1, 0, 0)
+    camera.direction = vec3(-1, 0, 0)  # turned left
+    assert camera.horizontal == vec3(0, 0, -1)
+
+
+class App:
+    render_scale = 0.5
+
+
+def test_render_scale():
+    camera = Camera(None, Signal(), vec2(960, 540))
+    half = Camera(App(), Signal(), vec2(960, 540))
+    p = vec3(100, -50, -2000)
+    assert half.world_to_screen(p) == camera.world_to_screen(p) / 2
+
+    positions, half_sizes = np.array([tuple(p)]), np.array([(16, 8)])
+    rects, visible = camera.project_many(positions, half_sizes)
+    half_rects, half_visible = half.project_many(positions, half_sizes)
+    assert np.allclose(half_rects, rects / 2)
+    assert visible.tolist() == half_visible.tolist() == [True]
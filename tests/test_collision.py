@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import random
+from glm import vec3
+from game.base import collision
+from game.base.entity import Entity
+from game.base.signal import Signal
+from game.util import segment_aabb
+from game.constants import LAYER_ENEMY, LAYER_PLAYER, LAYER_PLAYER_BULLET
+
+
+class Box(Entity):
+    def __init__(self, scene, position, size):
+        super().__init__(None, scene, position=position)
+        self.solid = True
+        self.collision_size = vec3(size)
+
+    def collision(self, other, dt):
+        pass
+
+
+def unordered(pairs):
+    return {frozenset((id(a), id(b))) for a, b in pairs}
+
+
+def test_overlaps():
+    scene = Signal()
+    a = Box(scene, vec3(0), vec3(10))
+    b = Box(scene, vec3(9, 0, 0), vec3(10))
+    c = Box(scene, vec3(0, 0, 11), vec3(10))
+    assert collision.overlaps(a, b)
+    assert not collision.overlaps(a, c)
+
+
+def test_sweep_matches_brute_force():
+    random.seed(1)
+    scene = Signal()
+    boxes = [
+        Box(
+            scene,
+            vec3(random.uniform(-500, 500), random.uniform(-500, 500), random.uniform(-3000, 0)),
+            vec3(random.uniform(10, 100), random.uniform(10, 100), random.uniform(10, 500)),
+        )
+        for i in range(200)
+    ]
+    boxes.append(Box(scene, vec3(0), vec3(0)))  # invalid size, never collides
+
+    brute = list(collision.brute_force_pairs(boxes))
+    sweep = list(collision.sweep_pairs(boxes))
+    batch = list(collision.ColliderTable()(boxes))
+
+    assert brute
+    # brute force reports both orders, sweep and batch only one
+    assert len(brute) == 2 * len(sweep) == 2 * len(batch)
+    assert unordered(brute) == unordered(sweep) == unordered(batch)
+
+
+class Shooter(Box):
+    collision_layer = LAYER_PLAYER_BULLET
+    collision_mask = LAYER_ENEMY
+
+
+class Target(Entity):
+    collision_layer = LAYER_ENEMY
+    collision_mask = LAYER_PLAYER | LAYER_PLAYER_BULLET
+
+    def __init__(self, scene, position):
+        super().__init__(None, scene, position=position)
+        self.solid = True
+        self.collision_size = vec3(10)
+
+
+def test_layers_prune_pairs():
+    scene = Signal()
+    bullets = [Shooter(scene, vec3(0), vec3(10)) for i in range(3)]
+    target = Target(scene, vec3(0))
+
+    for broadphase in collision.BROADPHASES.values():
+        stats = collision.new_stats()
+        pairs = list(broadphase(bullets + [target], stats))
+        # bullets never test against bullets
+        assert all(target in pair for pair in pairs)
+        assert stats["hits"] == len(pairs)
+        assert stats["pruned"] > 0
+
+    assert collision.wants(bullets[0], target)
+    assert not collision.wants(target, bullets[0])  # no collision() callback
+
+
+class FastShooter(Shooter):
+    swept = True
+
+
+def test_segment_aabb():
+    box_min, box_max = vec3(-1), vec3(1)
+    assert segment_aabb(vec3(-10, 0, 0), vec3(10, 0, 0), box_min, box_max) == 0.45
+    assert segment_aabb(vec3(0), vec3(0.5), box_min, box_max) == 0
+    assert segment_aabb(vec3(-10, 5, 0), vec3(10, 5, 0), box_min, box_max) is None
+    assert segment_aabb(vec3(-10, 0, 0), vec3(-5, 0, 0), box_min, box_max) is None
+
+
+def test_swept_bullet_cannot_tunnel():
+    scene = Signal()
+    target = Target(scene, vec3(0, 0, -2000))
+
+    # one long frame moved the bullet from in front of to behind the target
+    bullet = FastShooter(scene, vec3(0, 0, -5000), vec3(8))
+    bullet.last_position = vec3(0, 0, 0)
+    assert not collision.overlaps(bullet, target)
+    assert collision.collides(bullet, target)
+
+    # same path, but passing to the side
+    miss = FastShooter(scene, vec3(100, 0, -5000), vec3(8))
+    miss.last_position = vec3(100, 0, 0)
+    assert not collision.collides(miss, target)
+
+    for broadphase in collision.BROADPHASES.values():
+        pairs = list(broadphase([target, bullet, miss]))
+        assert unordered(pairs) == {frozenset((id(bullet), id(target)))}
+
+
+def test_contacts():
+    a, b, c = object(), object(), object()
+    contacts = collision.Contacts()
+
+    contacts.begin()
+    assert contacts.touch(a, b) == (True, True)
+    assert contacts.touch(b, a) == (False, False)  # same pair, other order
+    assert contacts.touch(a, c) == (True, True)
+    assert contacts.end() == []
+    assert len(contacts) == 2
+
+    contacts.begin()
+    assert contacts.touch(b, a) == (True, False)  # stay
+    left = contacts.end()
+    assert left == [(a, c)]
+    assert (a, b) in contacts
+    assert (a, c) not in contacts
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import random
+from glm import vec3
+from game.base.depth import depth_sort
+from game.base.entity import Entity
+from game.base.signal import Signal
+
+
+def make_scene(n):
+    scene = Signal()
+    for i in range(n):
+        e = Entity(None, scene, position=vec3(0, 0, random.uniform(-3000, 0)))
+        scene.connect(e, weak=False)
+    return scene
+
+
+def zs(slots):
+    return [s.get().position.z for s in slots]
+
+
+def test_depth_sort():
+    random.seed(2)
+    scene = make_scene(300)
+    slots, moved = depth_sort(scene.slots)
+    assert zs(slots) == sorted(zs(scene.slots))
+
+    # a few entities move, one is removed, one is added
+    for s in random.sample(slots, 10):
+        s.get().position += vec3(0, 0, random.uniform(-50, 50))
+    slots[5].get().removed = True
+    new = Entity(None, scene, position=vec3(0, 0, -1500))
+    slots.append(scene.connect(new, weak=False))
+
+    repaired, moved = depth_sort(slots)
+    assert 0 < moved <= 11
+    assert len(repaired) == 300
+    assert zs(repaired) == sorted(zs(repaired))
+    assert slots[5] not in repaired
+    assert any(s.get() is new for s in repaired)
+
+    # everything reversed, falls back to a full sort
+    for s in repaired:
+        s.get().position.z = -s.get().position.z
+    again, moved = depth_sort(repaired)
+    assert zs(again) == sorted(zs(again))
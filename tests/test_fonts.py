@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import pygame
+from game.base.fonts import FontService, quantize_size
+
+
+def test_quantize_size():
+    sizes = (8, 16, 24)
+    assert quantize_size(24, sizes) == 24
+    assert quantize_size(19, sizes) == 16
+    assert quantize_size(20, sizes) == 16  # tie
+    assert quantize_size(-3, sizes) == 8
+    assert quantize_size(300, sizes) == 24
+
+
+def test_shared_fonts():
+    pygame.font.init()
+    fonts = FontService()
+
+    # a powerup coming closer, a new size every frame
+    used = {id(fonts.get(size)) for size in range(1, 200)}
+    assert len(used) == len(fonts) == len(fonts.sizes)
+    assert fonts.loads == len(fonts.sizes)
+    assert fonts.get(23) is fonts.get(24) and fonts.get(24).bold
+
+    atlas = fonts.glyphs(24)
+    assert atlas is fonts.glyphs(25) and atlas.font is fonts.get(24)
+    before = fonts.bytes
+    atlas.get("A", (255, 0, 0))
+    assert fonts.bytes > before
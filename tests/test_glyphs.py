@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import pygame
+from game.base.glyphs import GlyphAtlas
+
+
+def test_atlas():
+    pygame.font.init()
+    font = pygame.font.Font(None, 24)
+    atlas = GlyphAtlas(font, capacity=2)
+
+    red = atlas.get("A", (255, 0, 0, 0))
+    expected = font.render("A", True, (255, 0, 0))
+    assert red.get_size() == expected.get_size()
+    x, y = [p // 2 for p in expected.get_size()]
+    assert red.get_at((x, y)) == expected.get_at((x, y))
+
+    assert atlas.get("A", (254, 1, 0)) is red  # same color once rounded
+    assert atlas.hits == 1 and atlas.misses == 1
+
+    atlas.get("A", (0, 255, 0))
+    atlas.get("B", (0, 255, 0))
+    assert len(atlas) == 2
+    assert atlas.get("A", (255, 0, 0)) is not red  # evicted
+    assert len(atlas.glyphs) == 2  # the white glyphs stay
+
+    # messages keep whole texts, the white ones are bounded too
+    for text in ("Level 1", "Go!", "Boss"):
+        atlas.get(text, (255, 255, 255))
+    assert list(atlas.glyphs) == ["Go!", "Boss"]
+    assert atlas.bytes == sum(
+        s.get_width() * s.get_height() * 4
+        for s in list(atlas.glyphs.values()) + list(atlas.tinted.values())
+    )
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import numpy as np
+from game.base.gradient import Gradient
+
+
+def test_recolor():
+    gradient = Gradient((40, 20), (80, 40), bands=64, noise=4)
+    assert gradient.bands == 20  # one band per row at most
+    assert gradient.surface.get_size() == (80, 40)
+    assert gradient.rows[0] == 0 and gradient.rows[-1] == 19 / 20
+
+    colors = [(y * 10, 0, 255 - y * 10) for y in range(20)]
+    noise = np.zeros((20, 4, 3))
+    gradient.recolor(colors, noise, 0)
+    assert tuple(gradient.surface.get_at((0, 0)))[:3] == (0, 0, 255)
+    assert tuple(gradient.surface.get_at((79, 39)))[:3] == (190, 0, 65)
+
+    # fully noisy
+    gradient.recolor(colors, noise + 100, 1)
+    assert tuple(gradient.surface.get_at((40, 20)))[:3] == (100, 100, 100)
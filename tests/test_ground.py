@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import math
+import pygame
+from glm import vec2, vec3, normalize
+from game.entities.camera import Camera
+from test_scene import App, make_scene
+
+
+def render_both(scene, camera):
+    """Ground drawn with strips and with the textured polygon fallback"""
+    ground = scene.ground
+    screen = pygame.display.get_surface()
+    poly, strips = ground.polygon(camera)
+
+    screen.fill((0, 0, 0))
+    ground.render(camera)
+    fast = screen.copy()
+
+    screen.fill((0, 0, 0))
+    pygame.gfxdraw.textured_polygon(screen, poly, ground.texture, 0, 0)
+    return strips, fast, screen.copy()
+
+
+def differences(a, b):
+    w, h = a.get_size()
+    return sum(a.get_at((x, y)) != b.get_at((x, y)) for x in range(w) for y in range(h))
+
+
+def test_strips():
+    scene = make_scene()
+    scene.app.cache = {}
+    scene.app.screen = pygame.display.get_surface()
+    scene.ground_color = "darkgreen"
+    # close enough to the ground to see it on a small screen
+    camera = Camera(None, scene, vec2(App.size), position=vec3(0, -200, 0))
+    w, h = App.size
+
+    strips, fast, slow = render_both(scene, camera)
+    assert len(strips) == 1
+    assert differences(fast, slow) <= w  # the horizon row at most
+    assert scene.ground.polygon(camera)[1] is strips  # cached
+
+    camera.up = normalize(vec3(math.sin(0.05), math.cos(0.05), 0))  # rolled
+    strips, fast, slow = render_both(scene, camera)
+    assert 1 < len(strips)
+    assert differences(fast, slow) <= 2 * w
+
+    camera.up = normalize(vec3(1, 1, 0))  # steep, polygon fallback
+    assert scene.ground.polygon(camera)[1] is None
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import pygame
+from game.base.overlay import Overlay
+
+
+def test_overlay_matches_blits():
+    size = (64, 48)
+    strips = [
+        ((0, 0), (64, 10), (255, 255, 255), 50),
+        ((0, 5), (32, 10), (200, 0, 0), 120),  # overlaps the first one
+        ((0, 40), (64, 8), (0, 0, 0), 200),
+    ]
+    overlay = Overlay(size)
+    expected = pygame.Surface(size)
+    expected.fill((30, 90, 160))
+    for pos, strip_size, color, alpha in strips:
+        overlay.strip(pos, strip_size, color, alpha)
+        surf = pygame.Surface(strip_size)
+        surf.set_alpha(alpha)
+        surf.fill(color)
+        expected.blit(surf, pos)
+
+    screen = pygame.Surface(size)
+    screen.fill((30, 90, 160))
+    overlay.render(screen)
+    assert [tuple(a) for a in overlay.areas] == [(0, 0, 64, 15), (0, 40, 64, 8)]
+
+    for x, y in [(1, 1), (1, 7), (40, 7), (1, 12), (1, 20), (1, 45)]:
+        a, b = screen.get_at((x, y)), expected.get_at((x, y))
+        assert all(abs(a[i] - b[i]) <= 2 for i in range(3)), (x, y, a, b)
+
+    cached = overlay.surface
+    overlay.render(screen)
+    assert overlay.surface is cached
+    overlay.clear()
+    assert overlay.surface is None
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import pygame
+from game.base.resources import ResourceCache
+
+
+def test_budget_and_pins():
+    image = 10 * 10 * 4  # bytes of a 10x10 surface
+    cache = ResourceCache({"image": 2 * image})
+    surf = lambda: pygame.Surface((10, 10), pygame.SRCALPHA)
+
+    crosshair = cache.load("crosshair", surf, pinned=True)
+    cache.load("a", surf)
+    assert cache.load("crosshair", surf) is crosshair
+    assert cache.hits == 1 and cache.misses == 2
+    assert cache.bytes["image"] == 2 * image
+
+    cache.load("b", surf)  # over budget, "a" is the oldest not pinned
+    assert "a" not in cache and "crosshair" in cache and "b" in cache
+    assert cache.evictions == 1
+
+    # still a dict for the magic keys
+    cache["ROCK"] = [surf()]
+    assert cache["ROCK"][0].get_size() == (10, 10)
+    del cache["ROCK"]
+    assert "ROCK" not in cache and cache.bytes["frames"] == 0
+
+
+def test_scopes():
+    cache = ResourceCache({})
+    cache.enter(1)
+    cache.load("BOSS", lambda: "boss", scoped=True)
+    cache.load("ship", lambda: "ship")
+    cache.load("heart", lambda: "heart", scoped=True, pinned=True)
+
+    cache.enter(1)  # same level again
+    assert "BOSS" in cache
+    cache.enter(2)
+    assert "BOSS" not in cache and "ship" in cache and "heart" in cache
+    assert len(cache) == 2
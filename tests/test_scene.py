@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from glm import vec2, vec3, ivec2
+from game.base.entity import Entity
+from game.constants import FULL_FOG_DISTANCE
+from game.entities.camera import Camera
+from game.scene import Scene
+
+
+class App:
+    size = ivec2(320, 240)
+    render_size = size
+    render_scale = 1
+    fps = 60
+    fixed_timestep = 0
+
+
+def make_scene():
+    pygame.display.init()
+    pygame.display.set_mode(App.size)
+    return Scene(App(), None)
+
+
+def test_remove():
+    scene = make_scene()
+    ents = [scene.add(Entity(None, scene, position=vec3(0, 0, -i))) for i in range(5)]
+
+    ents[1].remove()
+    scene.remove(ents[2])
+    # dead slots stay until the next update, but are skipped
+    assert len(scene.slots) == 5
+    assert list(scene.entities()) == [ents[0], ents[3], ents[4]]
+    seen = []
+    scene.each(lambda e: seen.append(e))
+    assert seen == [ents[0], ents[3], ents[4]]
+
+    scene.update(0.01)
+    assert len(scene.slots) == 3
+    assert list(scene.entities()) == [ents[4], ents[3], ents[0]]  # depth sorted
+
+
+class Thing(Entity):
+    pass
+
+
+class Special(Thing):
+    pass
+
+
+def test_types():
+    scene = make_scene()
+    a = scene.add(Thing(None, scene))
+    b = scene.add(Special(None, scene))
+    c = scene.add(Entity(None, scene))
+
+    assert list(scene.iter_entities(Thing)) == [a, b]
+    assert list(scene.iter_entities(Special)) == [b]
+    assert set(scene.iter_entities(Special, Entity)) == {a, b, c}
+    assert scene.count(Thing) == 2
+    assert scene.count(int) == 0
+
+    b.remove()
+    assert scene.count(Thing) == 1
+    assert scene.count(Special) == 0
+
+    scene.clear_type(Thing)
+    assert scene.count(Thing) == 0
+    assert list(scene.entities()) == [c]
+
+
+def test_interpolated():
+    scene = make_scene()
+    scene.interpolation = True
+    e = scene.add(Entity(None, scene, velocity=vec3(0, 0, -100)))
+    scene.update(1)
+    assert e.position == vec3(0, 0, -100)
+
+    with scene.interpolated(0.25):
+        assert e.position == vec3(0, 0, -25)
+    assert e.position == vec3(0, 0, -100)
+
+    with scene.interpolated(None):
+        assert e.position == vec3(0, 0, -100)
+
+
+class Unfogged(Entity):
+    fog = False
+
+
+def test_cull():
+    scene = make_scene()
+    camera = Camera(None, scene, vec2(App.size))
+    fog = camera.screen_dist * FULL_FOG_DISTANCE
+
+    def add(cls, pos):
+        e = scene.add(cls(None, scene, position=vec3(pos)))
+        e.sprite_size = (10, 10)
+        return e
+
+    shown = add(Entity, (0, 0, -100))
+    aside = add(Entity, (10000, 0, -100))
+    fogged = add(Entity, (0, 0, -fog - 10))
+    unfogged = add(Unfogged, (0, 0, -fog - 10))
+    behind = add(Entity, (0, 0, 100))
+
+    scene.cull(camera)
+    assert not shown.culled and not unfogged.culled
+    assert aside.culled and fogged.culled
+    assert not behind.culled  # removed by render()
+    assert scene.cull_stats == {"visible": 3, "culled": 2}
+
+
+def test_cull_before_render():
+    scene = make_scene()
+    camera = Camera(None, scene, vec2(App.size))
+
+    # never rendered, its center is off screen but its left half shows
+    pos = vec3(App.size.x / 2 + 40, 0, -camera.screen_dist)
+    cloud = scene.add(Entity(None, scene, position=pos))
+    cloud._surface = pygame.Surface((100, 20))
+    unknown = scene.add(Entity(None, scene, position=vec3(cloud.position)))
+
+    scene.cull(camera)
+    assert not cloud.culled
+    assert not unknown.culled  # no surface, size unknown until it renders
+
+    cloud.position = vec3(App.size.x / 2 + 60, 0, -camera.screen_dist)
+    scene.cull(camera)
+    assert cloud.culled
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+from glm import vec3
+from game.base.spatial import SpatialIndex
+
+
+class Thing:
+    def __init__(self, position, size=10):
+        self.position = vec3(position)
+        self.size = vec3(size)
+        self.removed = False
+
+
+class Other(Thing):
+    pass
+
+
+def test_within_and_nearest():
+    a = Thing((0, 0, -100))
+    b = Thing((0, 0, -300))
+    c = Other((0, 0, -200))
+    far = Thing((0, 0, -5000))
+    index = SpatialIndex()
+    index.rebuild([far, b, a, c, None])
+
+    assert index.within(vec3(0), 250) == [a, c]
+    assert index.within(vec3(0), 250, Other) == [c]
+    assert index.nearest(vec3(0)) is a
+    assert index.nearest(vec3(0), Thing, min_dist=150) is c
+    assert index.nearest(vec3(0), filter=lambda e: e is not a) is c
+    assert index.nearest(vec3(0), max_dist=50) is None
+
+    a.removed = True
+    assert index.nearest(vec3(0)) is c
+
+
+def test_nearest_cone():
+    ahead = Thing((0, 0, -1000))
+    side = Thing((500, 0, -100))
+    index = SpatialIndex()
+    index.rebuild([ahead, side])
+
+    assert index.nearest(vec3(0)) is side
+    assert index.nearest(vec3(0), cone=(vec3(0, 0, -1), 0.9)) is ahead
+    assert index.nearest(vec3(0), cone=(vec3(0, 0, 1), 0.9)) is None
+
+
+def test_raycast():
+    near = Thing((5, 0, -100))
+    far = Thing((0, 0, -1000))
+    off = Thing((100, 0, -500))
+    index = SpatialIndex()
+    index.rebuild([far, off, near])
+
+    hits = index.raycast(vec3(0), vec3(0, 0, -1), 2000)
+    assert [e for t, e in hits] == [near, far]
+    assert hits[0][0] == 100
+
+    assert index.raycast(vec3(0), vec3(0, 0, -1), 500) == [(100, near)]
+    assert [e for t, e in index.raycast(vec3(0), vec3(0, 0, -1), 2000, radius=100)] == [
+        near,
+        off,
+        far,
+    ]
+    # a cone wide enough to catch `off` at its distance
+    hits = index.raycast(vec3(0), vec3(0, 0, -1), 600, spread=0.2)
+    assert [e for t, e in hits] == [near, off]
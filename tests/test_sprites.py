@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import pygame
+from game.base.sprites import SpriteCache, quantize, set_palette
+
+
+def test_quantize():
+    assert quantize((10, 20)) == (10, 20)
+    assert quantize((100, 50)) == (100, 50)
+    assert quantize((101, 51)) == (100, 50)
+    assert quantize((300, 3)) == (296, 1)
+
+
+def test_sprite_cache():
+    src = pygame.Surface((32, 32))
+    cache = SpriteCache(budget=100 * 100 * 4 * 4)
+
+    a = cache.get(src, (100, 100))
+    assert a.get_size() == (100, 100)
+    assert cache.get(src, (101, 101)) is a  # same bucket
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    for i in range(3):
+        cache.get(pygame.Surface((16, 16)), (100, 100))
+    assert cache.evictions == 0
+    cache.get(src, (50, 50))  # over budget, evicts the oldest
+    assert cache.evictions == 1
+    assert cache.bytes <= cache.budget
+    assert cache.get(src, (100, 100)) is not a
+
+
+def test_fog_levels():
+    src = pygame.Surface((8, 8), pygame.SRCALPHA)
+    src.fill((255, 255, 255, 255))
+    cache = SpriteCache(budget=1 << 20, fog_levels=5)
+
+    assert cache.get(src) is src
+    assert cache.get(src, alpha=10) is None  # faded out
+    half = cache.get(src, (16, 16), 128)
+    assert half.get_size() == (16, 16)
+    assert half.get_at((0, 0)).a == 127  # level 2 of 4
+    assert cache.get(src, (16, 16), 120) is half  # same level
+    assert cache.get(src, (16, 16)).get_at((0, 0)).a == 255  # source untouched
+
+
+def test_fog_colorkey():
+    src = pygame.Surface((32, 32))
+    cache = SpriteCache(budget=1 << 20)
+
+    # far sprites are drawn with a black colorkey, even when not faded yet
+    assert cache.get(src, (16, 16)).get_colorkey() is None
+    assert cache.get(src, (16, 16), 255).get_colorkey() == (0, 0, 0, 255)
+    assert cache.get(src, alpha=255).get_colorkey() == (0, 0, 0, 255)
+    assert src.get_colorkey() is None
+    bounds = pygame.Rect(0, 0, 8, 8)
+    part, _ = cache.clipped(src, (64, 64), (0, 0), bounds, 255)
+    assert part.get_colorkey() == (0, 0, 0, 255)
+
+
+def test_mips_and_palette():
+    src = pygame.Surface((256, 256), depth=8)
+    set_palette(src, [(255, 0, 0)] * 256)
+    cache = SpriteCache(budget=1 << 22)
+
+    assert cache.mip(src, (100, 100)).get_size() == (128, 128)
+    assert cache.mip(src, (20, 30)).get_size() == (32, 32)
+    assert cache.mip(src, (200, 200)) is src
+
+    red = cache.get(src, (40, 40))
+    assert red.get_at((0, 0))[:3] == (255, 0, 0)
+    # palette changed in place (the boss turning gray), no stale copy
+    set_palette(src, [(128, 128, 128)] * 256)
+    gray = cache.get(src, (40, 40))
+    assert gray is not red
+    assert gray.get_at((0, 0))[:3] == (128, 128, 128)
+
+
+def test_clipped():
+    src = pygame.Surface((100, 100))
+    cache = SpriteCache(budget=1 << 20)
+    bounds = pygame.Rect(0, 0, 200, 100)
+
+    part, pos = cache.clipped(src, (1000, 1000), (-500, -500), bounds)
+    assert pos == (-500 + 50 * 10, -500 + 50 * 10)
+    assert part.get_size() == (200, 100)
+    assert cache.clipped(src, (1000, 1000), (-5000, 0), bounds) == (None, None)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+import sys
+
+sys.path.append("..")
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from glm import ivec2
+from game.base.fonts import FontService
+from game.entities.terminal import Terminal
+from game.base.signal import Signal
+
+
+class App:
+    size = ivec2(320, 240)
+
+    def __init__(self):
+        self.fonts = FontService()
+
+
+def make_terminal():
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode(App.size)
+    return Terminal(App(), Signal())
+
+
+def test_redraw_only_changes():
+    term = make_terminal()
+    term.write("Score: 10", (1, 1), "white")
+    term.write("HP", (1, 2), "red", (0, 10))
+    assert term.redraw()
+
+    # same text every frame, or overwritten then written back
+    term.write("Score: 10", (1, 1), "white")
+    term.write("      ", (1, 2), "red")
+    term.write("HP", (1, 2), "red", (0, 10))
+    term.write(" ", (3, 4), "red")  # spaces don't draw anything either
+    assert not term.redraw()
+
+    term.write("Score: 11", (1, 1), "white")
+    term.write("X", (-1, -1), "green")  # negative positions wrap
+    assert term.chars[-1, -1] == ord("X")
+    assert term.redraw()
+    partial = term.surface.copy()
+
+    term.drawn = None
+    assert term.redraw()
+    full = term.surface
+    w, h = App.size
+    assert all(
+        partial.get_at((x, y)) == full.get_at((x, y))
+        for x in range(0, w, 2)
+        for y in range(0, h, 2)
+    )
+
+    term.clear(1)
+    assert not term.chars[1].any() and term.chars[2].any()
+    term.clear()
+    assert not term.chars.any()
+
+
+def test_write_positions():
+    term = make_terminal()  # 13 x 10 cells
+    term.write("ab\ncd", (1, 2), "white")
+    term.write_center("abc", 5, "red")
+    term.write_center("abcd", 6, "red", char_offset=(1, 1))
+    term.write_center("x", 8, "red", length=5)
+    term.write_right("xyz", (-6, 3), "green")
+    term.write("wrap", (-2, 0), "blue")
+
+    # where the old one character at a time write() put them
+    rows = ["".join(chr(c) if c else "." for c in row) for row in term.chars]
+    assert rows == [
+        "ap.........wr",
+        ".............",
+        ".ab..........",
+        ".cd.....xyz..",
+        ".............",
+        "......abc....",
+        ".............",
+        "......abcd...",
+        ".....x.......",
+        ".............",
+    ]
+    assert term.colors[3, 1] == term.colors[2, 1] != term.colors[5, 6]
+
+
+def test_scramble_colors():
+    term = make_terminal()
+    term.scramble()
+    first = set(term.colors.flat)
+    term.scramble()
+    assert set(term.colors.flat) != first  # new colors every time
+    assert len(first) <= 8